@@ -0,0 +1,77 @@
+"""Чтение ленты под нагрузкой записью: потоки-читатели и потоки-писатели."""
+import threading
+import time
+
+from django.db import OperationalError, connection
+from django.test import Client
+from django.urls import reverse
+
+from core.timing import percentiles
+from posts.models import Post, User
+
+
+def reader(results, stop):
+    client = Client()
+    url = reverse('posts:index')
+    try:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                status = client.get(url).status_code
+            except OperationalError:
+                results['errors'] += 1
+                continue
+            if status == 200:
+                results['latency'].append(
+                    (time.perf_counter() - started) * 1000
+                )
+    finally:
+        connection.close()
+
+
+def writer(results, stop, author_ids):
+    number = 0
+    try:
+        while not stop.is_set():
+            number += 1
+            try:
+                Post.objects.create(
+                    author_id=author_ids[number % len(author_ids)],
+                    text='Пост писателя %s' % number,
+                )
+            except OperationalError:
+                results['errors'] += 1
+                continue
+            results['count'] += 1
+    finally:
+        connection.close()
+
+
+def run(readers, writers, duration):
+    """Гоняет потоки duration секунд, возвращает пропускную способность."""
+    author_ids = list(User.objects.values_list('pk', flat=True)[:10])
+    reads = {'latency': [], 'errors': 0}
+    writes = {'count': 0, 'errors': 0}
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=reader, args=(reads, stop))
+        for _ in range(readers)
+    ] + [
+        threading.Thread(target=writer, args=(writes, stop, author_ids))
+        for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {
+        'reads_per_second': round(len(reads['latency']) / duration, 1),
+        'read_latency_ms': (
+            percentiles(reads['latency']) if reads['latency'] else {}
+        ),
+        'read_errors': reads['errors'],
+        'writes_per_second': round(writes['count'] / duration, 1),
+        'write_errors': writes['errors'],
+    }
@@ -0,0 +1,79 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment, teardown_test_environment,
+)
+
+from benchmarks import runner
+from benchmarks.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет тестовую базу и замеряет представления posts: '
+        'перцентили времени ответа, число запросов и пиковую память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=5)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=2000)
+        parser.add_argument('--follows', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--scenario', action='append', choices=runner.SCENARIOS,
+            help='Замерять только указанные представления.',
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом.',
+        )
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 or options['posts'] < 1:
+            raise CommandError('Нужны хотя бы два автора и один пост.')
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            started = time.perf_counter()
+            data = seed(
+                options['users'], options['groups'], options['posts'],
+                options['comments'], options['follows'], options['seed'],
+            )
+            seeded = time.perf_counter() - started
+            results = runner.run(
+                data,
+                options['requests'],
+                options['scenario'] or tuple(runner.SCENARIOS),
+                random_seed=options['seed'],
+                cold=options['cold'],
+                warmup=options['warmup'],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        report = json.dumps({
+            'options': {
+                name: options[name] for name in (
+                    'users', 'groups', 'posts', 'comments', 'follows',
+                    'requests', 'warmup', 'seed', 'cold',
+                )
+            },
+            'seed_seconds': round(seeded, 2),
+            'scenarios': results,
+            'peak_rss_kb': runner.peak_rss_kb(),
+        }, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report + '\n')
+        self.stdout.write(report)
@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment,
+)
+
+from benchmarks import concurrency
+from benchmarks.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет чтение главной страницы, пока другие потоки пишут '
+        'посты. С --compare прогоняет и без SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument(
+            '--compare', action='store_true',
+            help='Сравнить с настройками SQLite по умолчанию.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Замер рассчитан на SQLite.')
+        modes = {'tuned': None}
+        if options['compare']:
+            modes = {'default': {}, **modes}
+        report = {
+            name: self.measure(options, pragmas)
+            for name, pragmas in modes.items()
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def measure(self, options, pragmas):
+        """Прогон на свежей файловой базе: WAL в памяти не работает."""
+        directory = tempfile.mkdtemp()
+        settings_dict = connection.settings_dict
+        old_name, old_test = settings_dict['NAME'], settings_dict['TEST']
+        settings_dict['TEST'] = {
+            **old_test, 'NAME': os.path.join(directory, 'bench.sqlite3')
+        }
+        overrides = {} if pragmas is None else {'SQLITE_PRAGMAS': pragmas}
+        setup_test_environment()
+        try:
+            with override_settings(**overrides):
+                connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, serialize=False
+                )
+                try:
+                    seed(
+                        users=20, groups=3, posts=options['posts'],
+                        comments=0, follows=20,
+                    )
+                    return concurrency.run(
+                        options['readers'],
+                        options['writers'],
+                        options['duration'],
+                    )
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            teardown_test_environment()
+            settings_dict['TEST'] = old_test
+            shutil.rmtree(directory, ignore_errors=True)
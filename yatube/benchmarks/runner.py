@@ -0,0 +1,96 @@
+"""Прогон представлений posts тестовым клиентом и сбор отчёта."""
+import random
+import resource
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.timing import percentiles
+
+SCENARIOS = {
+    'index': lambda data, rng: (
+        'get', reverse('posts:index'), {'page': rng.randint(1, 3)}
+    ),
+    'group_posts': lambda data, rng: (
+        'get',
+        reverse('posts:group_posts', args=(rng.choice(data.slugs),)),
+        {},
+    ),
+    'profile': lambda data, rng: (
+        'get',
+        reverse('posts:profile', args=(rng.choice(data.usernames),)),
+        {},
+    ),
+    'post_detail': lambda data, rng: (
+        'get',
+        reverse('posts:post_detail', args=(rng.choice(data.post_ids),)),
+        {},
+    ),
+    'follow_index': lambda data, rng: (
+        'get', reverse('posts:follow_index'), {'page': rng.randint(1, 3)}
+    ),
+    'post_create': lambda data, rng: (
+        'post',
+        reverse('posts:post_create'),
+        {'text': 'Пост из замера %s' % rng.random()},
+    ),
+    'add_comment': lambda data, rng: (
+        'post',
+        reverse('posts:add_comment', args=(rng.choice(data.post_ids),)),
+        {'text': 'Комментарий из замера %s' % rng.random()},
+    ),
+}
+
+
+def peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(client, method, url, payload, cold=False):
+    if cold:
+        cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = getattr(client, method)(url, payload)
+        elapsed = (time.perf_counter() - started) * 1000
+    return elapsed, len(queries), response.status_code
+
+
+def summarize(samples):
+    latency, queries, statuses = zip(*samples)
+    return {
+        'requests': len(samples),
+        'latency_ms': {
+            **percentiles(latency),
+            'mean': round(sum(latency) / len(latency), 1),
+        },
+        'queries': {**percentiles(queries), 'max': max(queries)},
+        'statuses': dict(Counter(map(str, statuses))),
+    }
+
+
+@override_settings(RATELIMITS={})
+def run(data, requests, scenarios=tuple(SCENARIOS), random_seed=0,
+        cold=False, warmup=1):
+    """Замер сценариев с отключенными лимитами частоты.
+
+    Иначе записи упираются в 429 и замеряется страница ошибки.
+    """
+    rng = random.Random(random_seed)
+    client = Client()
+    client.force_login(data.reader)
+    results = {}
+    for name in scenarios:
+        scenario = SCENARIOS[name]
+        for _ in range(warmup):
+            measure(client, *scenario(data, rng))
+        results[name] = summarize([
+            measure(client, *scenario(data, rng), cold=cold)
+            for _ in range(requests)
+        ])
+    return results
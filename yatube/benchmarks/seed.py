@@ -0,0 +1,112 @@
+"""Воспроизводимое наполнение базы для замеров."""
+import random
+from io import StringIO
+from itertools import islice
+
+from django.core.management import call_command
+from django.db import transaction
+from faker import Faker
+from mixer.backend.django import Mixer
+
+from posts import versions
+from posts.models import Comment, Follow, Group, Post, User
+
+PREFIX = 'bench'
+BATCH_SIZE = 500
+
+
+class Data:
+    """Идентификаторы созданных объектов для построения запросов."""
+
+    def __init__(self):
+        self.usernames = []
+        self.slugs = []
+        self.post_ids = []
+        self.reader = None
+
+
+def blend(mixer, model, count, **values):
+    objects = [mixer.blend(model, **values) for _ in range(count)]
+    model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+def pairs(rng, ids, count):
+    """Уникальные пары (подписчик, автор); первый подписчик — читатель."""
+    def generate():
+        for author_id in ids[1:]:
+            yield ids[0], author_id
+        while True:
+            yield tuple(rng.sample(ids, 2))
+    seen = set()
+    for pair in generate():
+        if len(seen) >= count or len(seen) >= len(ids) * (len(ids) - 1):
+            break
+        seen.add(pair)
+    return seen
+
+
+@transaction.atomic
+def seed(users, groups, posts, comments, follows, random_seed=0):
+    random.seed(random_seed)
+    Faker.seed(random_seed)
+    rng = random.Random(random_seed)
+    mixer = Mixer(commit=False)
+    data = Data()
+
+    blend(
+        mixer, User, users,
+        username=mixer.sequence(PREFIX + '-user-{0}'),
+    )
+    user_ids = list(User.objects.filter(
+        username__startswith=PREFIX + '-user-'
+    ).order_by('pk').values_list('pk', flat=True))
+    blend(
+        mixer, Group, groups,
+        slug=mixer.sequence(PREFIX + '-group-{0}'),
+    )
+    group_ids = list(Group.objects.filter(
+        slug__startswith=PREFIX + '-group-'
+    ).order_by('pk').values_list('pk', flat=True))
+
+    def posts_values():
+        while True:
+            yield {
+                'author_id': rng.choice(user_ids),
+                'group_id': rng.choice(group_ids + [None]),
+            }
+    Post.objects.bulk_create((
+        mixer.blend(Post, image='', thumbnails='', text_html='', **values)
+        for values in islice(posts_values(), posts)
+    ), batch_size=BATCH_SIZE)
+    post_ids = list(Post.objects.filter(
+        author_id__in=user_ids
+    ).values_list('pk', flat=True))
+    Comment.objects.bulk_create((
+        mixer.blend(
+            Comment,
+            post_id=rng.choice(post_ids),
+            author_id=rng.choice(user_ids),
+            text_html='',
+        ) for _ in range(comments)
+    ), batch_size=BATCH_SIZE)
+    Follow.objects.bulk_create((
+        Follow(user_id=user_id, author_id=author_id)
+        for user_id, author_id in sorted(pairs(rng, user_ids, follows))
+    ), batch_size=BATCH_SIZE)
+
+    for command in (
+        'rebuild_timelines', 'recount_stats', 'rebuild_search_index',
+        'render_text_html',
+    ):
+        call_command(command, stdout=StringIO())
+    versions.bump('index', 'groups')
+
+    data.usernames = list(User.objects.filter(
+        pk__in=user_ids
+    ).values_list('username', flat=True))
+    data.slugs = list(Group.objects.filter(
+        pk__in=group_ids
+    ).values_list('slug', flat=True))
+    data.post_ids = post_ids
+    data.reader = User.objects.get(pk=user_ids[0])
+    return data
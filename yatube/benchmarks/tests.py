@@ -0,0 +1,42 @@
+from django.test import TestCase, override_settings
+
+from posts.models import Comment, Follow, Post, TimelineEntry
+
+from . import runner
+from .seed import seed
+
+
+class BenchmarkTests(TestCase):
+    def test_seed_and_run(self):
+        """Наполнение воспроизводимо, отчёт есть по всем представлениям."""
+        data = seed(
+            users=5, groups=2, posts=20, comments=10, follows=6,
+            random_seed=1,
+        )
+        self.assertEqual(Post.objects.count(), 20)
+        self.assertEqual(Comment.objects.count(), 10)
+        self.assertEqual(Follow.objects.count(), 6)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=data.reader).exists()
+        )
+        results = runner.run(data, requests=2)
+        self.assertEqual(set(results), set(runner.SCENARIOS))
+        for name, result in results.items():
+            with self.subTest(name=name):
+                self.assertEqual(result['requests'], 2)
+                self.assertEqual(
+                    set(result['latency_ms']), {'p50', 'p95', 'p99', 'mean'}
+                )
+                self.assertTrue(
+                    set(result['statuses']) <= {'200', '302'}
+                )
+
+    @override_settings(RATELIMITS={'posts:post_create': {'user': '1/h'}})
+    def test_run_ignores_rate_limits(self):
+        """Замер записей не упирается в лимиты частоты."""
+        data = seed(
+            users=2, groups=1, posts=2, comments=0, follows=1,
+            random_seed=1,
+        )
+        result = runner.run(data, requests=3, scenarios=('post_create',))
+        self.assertEqual(result['post_create']['statuses'], {'302': 3})
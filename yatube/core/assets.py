@@ -0,0 +1,94 @@
+"""Статика с хешем содержимого в имени и заранее сжатыми вариантами.
+
+collectstatic с HashedStaticStorage пишет копии вида logo.<хеш>.png и
+манифест staticfiles.json; compress_all кладет рядом .br и .gz. Файлы с
+хешем в имени не меняются, поэтому их можно кешировать навсегда.
+"""
+import gzip
+import os
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=0, must-revalidate'
+
+
+def gzip_compress(data):
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+# В порядке предпочтения при выборе по Accept-Encoding.
+ENCODINGS = {
+    'br': ('.br', brotli.compress),
+    'gzip': ('.gz', gzip_compress),
+}
+
+
+class HashedStaticStorage(ManifestStaticFilesStorage):
+    """Хешированные имена из манифеста; без манифеста — исходные имена.
+
+    До первой сборки (в разработке и тестах) {% static %} не падает,
+    а отдает путь как есть.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def is_immutable(self, name):
+        """Имя с хешем содержимого, записанное сборкой в манифест."""
+        return name in self.hashed_files.values()
+
+
+def compress_all(storage):
+    """Сжимает каждый файл манифеста; возвращает число записанных файлов.
+
+    Вариант сохраняется, только если он меньше исходного файла: уже
+    сжатые форматы вроде PNG остаются как есть.
+    """
+    names = set(storage.hashed_files) | set(storage.hashed_files.values())
+    written = 0
+    for name in sorted(names):
+        path = storage.path(name)
+        with open(path, 'rb') as stream:
+            data = stream.read()
+        for suffix, compress in ENCODINGS.values():
+            variant = compress(data)
+            if len(variant) >= len(data):
+                continue
+            with open(path + suffix, 'wb') as stream:
+                stream.write(variant)
+            written += 1
+    return written
+
+
+def accepted(header):
+    """Кодировки из Accept-Encoding с ненулевым весом."""
+    encodings = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        weight = params.strip()
+        if weight.startswith('q='):
+            try:
+                if float(weight[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(coding.strip().lower())
+    return encodings
+
+
+def variant(path, header):
+    """Путь и кодировка лучшего готового варианта файла для клиента."""
+    encodings = accepted(header)
+    for coding, (suffix, _) in ENCODINGS.items():
+        if (coding in encodings or '*' in encodings) and os.path.isfile(
+            path + suffix
+        ):
+            return path + suffix, coding
+    return path, None
@@ -0,0 +1,103 @@
+"""Отдача файлов с диска: проверка пути, валидаторы кеша и диапазоны.
+
+Файл никогда не читается в память целиком: полный ответ отдает
+FileResponse (сервер может применить sendfile), диапазон — генератор
+блоками, а при MEDIA_SENDFILE передачу берет на себя прокси.
+"""
+import os
+import re
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date
+
+BLOCK_SIZE = 64 * 1024
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def resolve(root, path):
+    """Абсолютный путь к обычному файлу внутри root или Http404."""
+    try:
+        full_path = safe_join(root, path)
+    except (SuspiciousFileOperation, ValueError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return full_path
+
+
+def etag(stat):
+    """ETag из времени изменения и размера, без чтения файла."""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def byte_range(header, size):
+    """Диапазон (начало, конец включительно) из заголовка Range.
+
+    None — заголовка нет или он не разобран (отдается весь файл);
+    ValueError — диапазон вне файла. Несколько диапазонов сразу не
+    поддерживаются и тоже дают весь файл.
+    """
+    match = RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        if not int(last) or not size:
+            raise ValueError(header)
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def iter_range(path, start, end):
+    """Байты файла с start по end включительно, блоками."""
+    with open(path, 'rb') as stream:
+        stream.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = stream.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                return
+            remaining -= len(block)
+            yield block
+
+
+def content(request, path, stat, tag, content_type):
+    """Ответ с телом файла: целиком или запрошенный диапазон.
+
+    If-Range, не совпавший с текущей версией файла, отменяет Range.
+    """
+    header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range not in (tag, http_date(stat.st_mtime)):
+        header = None
+    try:
+        bounds = byte_range(header, stat.st_size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    if bounds is None:
+        response = FileResponse(
+            open(path, 'rb'), content_type=content_type
+        )
+    else:
+        start, end = bounds
+        response = StreamingHttpResponse(
+            iter_range(path, start, end), status=206,
+            content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,32 @@
+from io import StringIO
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from core import assets
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает статику в STATIC_ROOT с хешем содержимого в именах и '
+        'манифестом, затем кладет рядом сжатые варианты .br и .gz.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Удалить прежнюю сборку перед копированием.',
+        )
+
+    def handle(self, *args, clear, **options):
+        call_command(
+            'collectstatic', interactive=False, clear=clear,
+            stdout=StringIO(),
+        )
+        written = assets.compress_all(staticfiles_storage)
+        self.stdout.write(self.style.SUCCESS(
+            f'Файлов: {len(staticfiles_storage.hashed_files)}, '
+            f'сжатых вариантов: {written} '
+            f'({", ".join(assets.ENCODINGS)})'
+        ))
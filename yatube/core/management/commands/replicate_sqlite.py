@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import replication
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из DATABASE_REPLICAS. '
+        'Только для локальной проверки маршрутизации чтений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Пауза между копированиями, секунды.',
+        )
+        parser.add_argument('--once', action='store_true')
+
+    def handle(self, *args, interval, once, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('DATABASE_REPLICAS пуст.')
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                try:
+                    replication.sync(alias)
+                except ValueError as error:
+                    raise CommandError(error)
+            if once:
+                return
+            time.sleep(interval)
@@ -0,0 +1,99 @@
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import ratelimit, routers, timing
+from .views import too_many_requests
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'primary'
+
+
+class TimingMiddleware:
+    """Замеряет запрос и добавляет заголовок Server-Timing."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = timing.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.execute)
+                    )
+                response = self.get_response(request)
+        finally:
+            timing.stop()
+        match = request.resolver_match
+        timing.record(match.view_name if match else '-', timings)
+        if settings.TIMING_HEADER:
+            response['Server-Timing'] = timings.header()
+        return response
+
+
+class ReplicaMiddleware:
+    """Направляет чтения лент на реплику.
+
+    После записи ответ ставит cookie, и следующие
+    REPLICA_PIN_SECONDS секунд пользователь читает с основной базы,
+    чтобы видеть свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.local.replica = None
+        routers.local.wrote = False
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.local.replica = None
+        if settings.DATABASE_REPLICAS and (
+            routers.local.wrote or request.method not in SAFE_METHODS
+        ):
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+        ):
+            routers.local.replica = random.choice(
+                settings.DATABASE_REPLICAS
+            )
+
+
+class RateLimitMiddleware:
+    """Отвечает 429 на запросы сверх лимитов RATELIMITS."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        retry_after = ratelimit.check(
+            request, request.resolver_match.view_name
+        )
+        if not retry_after:
+            return None
+        timings = timing.current()
+        if timings is not None:
+            timings.blocked = True
+        response = too_many_requests(request)
+        response['Retry-After'] = str(retry_after)
+        return response
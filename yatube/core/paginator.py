@@ -0,0 +1,143 @@
+import base64
+import binascii
+import json
+from math import ceil
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.signing import BadSignature, Signer
+from django.db.models import Q
+
+# Сколько ссылок на соседние страницы показывать с каждой стороны.
+PAGE_WINDOW = 4
+
+
+def page_window(page):
+    """Номера страниц для ссылок: не больше PAGE_WINDOW по сторонам."""
+    return range(
+        max(1, page.number - PAGE_WINDOW),
+        min(page.paginator.num_pages, page.number + PAGE_WINDOW) + 1
+    )
+
+
+class CursorPaginator(Paginator):
+    """Пагинация по ключу (order_field, pk) без COUNT(*) и глубоких OFFSET.
+
+    Возвращает обычный ``Page``: у страницы дополнительно есть
+    ``next_cursor`` и ``previous_cursor`` — непрозрачные токены для
+    параметра ``?cursor=``. Общее число объектов известно лишь
+    приблизительно: либо из переданного ``count``, либо по уже
+    просмотренным строкам.
+
+    Токен подписан: номер страницы внутри него определяет ``count``,
+    и поддельный курсор не должен раздувать навигацию. Ссылки на
+    страницы — лишь окно ``page_window`` вокруг текущей.
+    """
+
+    signer = Signer(salt='core.paginator.cursor')
+
+    def __init__(self, object_list, per_page, order_field='pub_date',
+                 count=None):
+        super().__init__(object_list, per_page)
+        self.order_field = order_field
+        self.approximate_count = count
+        self.seen = 0
+        self.exact = True
+
+    @property
+    def count(self):
+        if self.approximate_count is None or self.exact:
+            return self.seen
+        return max(self.approximate_count, self.seen)
+
+    @property
+    def num_pages(self):
+        return max(1, ceil(self.count / self.per_page))
+
+    def get_page(self, number=None, cursor=None):
+        if cursor:
+            try:
+                page = self.cursor_page(cursor)
+            except (TypeError, ValueError, ValidationError, BadSignature,
+                    binascii.Error):
+                page = None
+            if page is not None and page.object_list:
+                return page
+        try:
+            number = max(1, int(number))
+        except (TypeError, ValueError):
+            number = 1
+        page = self.page(number)
+        if not page.object_list and number > 1:
+            return self.page(1)
+        return page
+
+    def page(self, number):
+        bottom = (number - 1) * self.per_page
+        rows = list(self.ordered()[bottom:bottom + self.per_page + 1])
+        return self.build_page(rows, number)
+
+    def cursor_page(self, cursor):
+        value, pk, number, backwards = self.decode(cursor)
+        rows = list(self.seek(value, pk, backwards)[:self.per_page + 1])
+        if not backwards:
+            return self.build_page(rows, number)
+        if len(rows) <= self.per_page:
+            number = 1
+        return self.build_page(rows[:self.per_page][::-1], number, True)
+
+    def seek(self, value, pk, backwards=False):
+        """Строки после ключа (value, pk) в порядке обхода.
+
+        Условие с нестрогим неравенством избыточно, но позволяет базе
+        начать чтение индекса прямо с ключа, а не с начала ленты.
+        """
+        lookup = 'gt' if backwards else 'lt'
+        return self.ordered(reverse=backwards).filter(
+            **{f'{self.order_field}__{lookup}e': value}
+        ).filter(
+            Q(**{f'{self.order_field}__{lookup}': value})
+            | Q(**{self.order_field: value, f'pk__{lookup}': pk})
+        )
+
+    def ordered(self, reverse=False):
+        prefix = '' if reverse else '-'
+        return self.object_list.order_by(
+            f'{prefix}{self.order_field}', f'{prefix}pk'
+        )
+
+    def build_page(self, rows, number, has_next=None):
+        if has_next is None:
+            has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        self.seen = (number - 1) * self.per_page + len(rows) + has_next
+        self.exact = not has_next
+        page = self._get_page(rows, number, self)
+        page.next_cursor = (
+            self.encode(rows[-1], number + 1) if has_next and rows else None
+        )
+        page.previous_cursor = (
+            self.encode(rows[0], number - 1, True)
+            if rows and number > 1 else None
+        )
+        return page
+
+    def key(self, row):
+        if isinstance(row, dict):
+            return row[self.order_field], row.get('pk', row.get('id'))
+        return getattr(row, self.order_field), row.pk
+
+    def encode(self, row, number, backwards=False):
+        value, pk = self.key(row)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        data = json.dumps([value, pk, number, int(backwards)])
+        return self.signer.sign(
+            base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+        )
+
+    def decode(self, cursor):
+        cursor = self.signer.unsign(cursor)
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, pk, number, backwards = json.loads(data.decode())
+        return value, int(pk), max(1, int(number)), bool(backwards)
@@ -0,0 +1,72 @@
+"""Ограничение частоты запросов: корзины токенов в кэше.
+
+Правила задаются в RATELIMITS по имени маршрута: частота вида
+'20/m' отдельно для пользователя и для IP, плюс методы, к которым
+правило применяется. Чтение и запись корзины не атомарны, поэтому при
+гонке между процессами лимит может быть превышен на единицы запросов.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+KEY = 'ratelimit:{}:{}:{}'
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse(rate):
+    """'20/m' -> (20, 60): емкость корзины и время ее наполнения."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[-1]] * int(period[:-1] or 1)
+
+
+def take(key, rate):
+    """Берет токен; возвращает 0 или через сколько секунд повторить."""
+    capacity, period = parse(rate)
+    now = time.time()
+    tokens, updated = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated) * capacity / period)
+    if tokens >= 1:
+        cache.set(key, (tokens - 1, now), period)
+        return 0
+    return math.ceil((1 - tokens) * period / capacity)
+
+
+def client_ip(request):
+    """Адрес клиента с учетом RATELIMIT_TRUSTED_PROXIES доверенных прокси.
+
+    Каждый прокси дописывает адрес справа, а левые записи присылает сам
+    клиент, поэтому берется адрес, добавленный самым дальним доверенным
+    прокси. Если записей меньше, чем прокси, заголовку не доверяем.
+    """
+    header = settings.RATELIMIT_IP_HEADER
+    proxies = settings.RATELIMIT_TRUSTED_PROXIES
+    addresses = [
+        address.strip()
+        for address in request.META.get(header or '', '').split(',')
+        if address.strip()
+    ]
+    if header and proxies and len(addresses) >= proxies:
+        return addresses[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def identities(request):
+    yield 'ip', client_ip(request)
+    if request.user.is_authenticated:
+        yield 'user', request.user.pk
+
+
+def check(request, name):
+    """Секунды до следующей попытки или 0, если запрос пропускается."""
+    rule = settings.RATELIMITS.get(name)
+    if rule is None or request.method not in rule.get('methods', ('POST',)):
+        return 0
+    return max(
+        (
+            take(KEY.format(name, scope, identity), rule[scope])
+            for scope, identity in identities(request) if scope in rule
+        ),
+        default=0,
+    )
@@ -0,0 +1,17 @@
+"""Копирование основной базы SQLite в реплики для локальной проверки."""
+from django.db import connections
+
+from .routers import PRIMARY
+
+
+def copy(source, target):
+    """Переносит содержимое одного соединения sqlite3 в другое."""
+    source.backup(target)
+
+
+def sync(alias, source=PRIMARY):
+    for name in (source, alias):
+        if connections[name].vendor != 'sqlite':
+            raise ValueError(f'База {name} — не SQLite')
+        connections[name].ensure_connection()
+    copy(connections[source].connection, connections[alias].connection)
@@ -0,0 +1,36 @@
+"""Чтение лент с реплик, запись — в основную базу.
+
+Реплику для текущего запроса выбирает ``ReplicaMiddleware``; вне
+запросов (воркеры, команды) и после первой записи все запросы идут
+в основную базу.
+"""
+import threading
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+local = threading.local()
+
+
+def current_replica():
+    return getattr(local, 'replica', None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return current_replica()
+
+    def db_for_write(self, model, **hints):
+        local.replica = None
+        local.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
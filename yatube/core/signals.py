@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение SQLite по SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        if not (name.isidentifier() and str(value).lstrip('-').isalnum()):
+            raise ValueError(f'Недопустимая прагма SQLite: {name}={value}')
+        connection.connection.execute(f'PRAGMA {name} = {value}')
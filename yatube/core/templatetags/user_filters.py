@@ -1,8 +1,15 @@
 from django import template
 
+from core import paginator
+
 register = template.Library()
 
 
 @register.filter
 def addclass(field, css):
     return field.as_widget(attrs={'class': css})
+
+
+@register.filter
+def page_window(page):
+    return paginator.page_window(page)
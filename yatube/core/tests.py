@@ -0,0 +1,440 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import (
+    Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import resolve, reverse
+
+from posts.models import Post
+
+from . import assets, ratelimit, replication, routers, timing
+from .middleware import PIN_COOKIE, ReplicaMiddleware
+from .signals import apply_sqlite_pragmas
+
+User = get_user_model()
+INDEX_URL = reverse('posts:index')
+TIMINGS_URL = reverse('core:timings')
+
+
+class TimingTests(TestCase):
+    def setUp(self):
+        timing.samples.clear()
+
+    def test_server_timing_header(self):
+        """Ответ содержит замеры SQL, шаблонов и общего времени."""
+        header = self.client.get(INDEX_URL)['Server-Timing']
+        for metric in ('db;', 'thumbnails;', 'total;'):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, header)
+        self.assertIn('desc="posts/index.html"', header)
+        self.assertIn('desc="includes/paginator.html"', header)
+
+    @override_settings(TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        """Заголовок Server-Timing отключается настройкой."""
+        self.assertFalse(
+            self.client.get(INDEX_URL).has_header('Server-Timing')
+        )
+
+    def test_timings_are_collected_per_url_name(self):
+        """Замеры накапливаются по имени маршрута и видны персоналу."""
+        self.client.get(INDEX_URL)
+        self.client.get(INDEX_URL)
+        staff = Client()
+        staff.force_login(User.objects.create_user('staff', is_staff=True))
+        data = staff.get(TIMINGS_URL).json()
+        self.assertEqual(data['posts:index']['count'], 2)
+        self.assertEqual(
+            sum(data['posts:index']['histogram_ms'].values()), 2
+        )
+        self.assertEqual(
+            set(data['posts:index']['total_ms']), {'p50', 'p95', 'p99'}
+        )
+
+    def test_timings_are_hidden_from_users(self):
+        """Обычный пользователь не видит замеры."""
+        user = Client()
+        user.force_login(User.objects.create_user('user'))
+        for client in (self.client, user):
+            with self.subTest(client=client):
+                self.assertEqual(client.get(TIMINGS_URL).status_code, 302)
+
+
+class SqlitePragmasTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234})
+    def test_pragmas_are_applied(self):
+        """Прагмы из настроек применяются к соединению."""
+        apply_sqlite_pragmas(None, connection)
+        self.assertEqual(self.pragma('busy_timeout'), 1234)
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': '1; DROP TABLE x'})
+    def test_invalid_pragma_is_rejected(self):
+        """Значения прагм не подставляются в SQL как есть."""
+        with self.assertRaises(ValueError):
+            apply_sqlite_pragmas(None, connection)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = routers.ReplicaRouter()
+
+    def tearDown(self):
+        routers.local.replica = None
+
+    def routed_view(self, request):
+        """База для чтений, которую middleware выбрала бы представлению."""
+        request.resolver_match = resolve(request.path)
+        ReplicaMiddleware(HttpResponse).process_view(request, None, (), {})
+        return self.router.db_for_read(Post)
+
+    def test_feed_reads_go_to_replica(self):
+        """Чтения лент идут на реплику, остальное — в основную базу."""
+        post_create = reverse('posts:post_create')
+        cases = (
+            (self.factory.get(INDEX_URL), 'replica'),
+            (self.factory.get(post_create), None),
+            (self.factory.post(INDEX_URL), None),
+        )
+        for request, database in cases:
+            with self.subTest(request=request):
+                routers.local.replica = None
+                self.assertEqual(self.routed_view(request), database)
+
+    def test_reads_after_write_go_to_primary(self):
+        """После записи чтения идут в основную базу."""
+        routers.local.replica = 'replica'
+        self.assertEqual(
+            self.router.db_for_write(Post), routers.PRIMARY
+        )
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_user_is_pinned_to_primary_after_write(self):
+        """После записи пользователь читает с основной базы по cookie."""
+        author = User.objects.create_user('author')
+
+        def write(request):
+            Post.objects.create(author=author, text='Пост')
+            return HttpResponse()
+
+        response = ReplicaMiddleware(write)(self.factory.get(INDEX_URL))
+        self.assertEqual(
+            response.cookies[PIN_COOKIE]['max-age'],
+            settings.REPLICA_PIN_SECONDS
+        )
+        request = self.factory.get(INDEX_URL)
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertIsNone(self.routed_view(request))
+        self.assertNotIn(
+            PIN_COOKIE,
+            ReplicaMiddleware(HttpResponse)(
+                self.factory.get(INDEX_URL)
+            ).cookies
+        )
+
+
+class ReplicationTests(TestCase):
+    def test_copy_replicates_database(self):
+        """Реплика получает содержимое основной базы."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        primary = sqlite3.connect(os.path.join(directory, 'primary.db'))
+        replica = sqlite3.connect(os.path.join(directory, 'replica.db'))
+        self.addCleanup(primary.close)
+        self.addCleanup(replica.close)
+        primary.execute('CREATE TABLE post (text TEXT)')
+        primary.execute("INSERT INTO post VALUES ('Пост')")
+        primary.commit()
+        replication.copy(primary, replica)
+        self.assertEqual(
+            replica.execute('SELECT text FROM post').fetchall(), [('Пост',)]
+        )
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaEndToEndTests(TransactionTestCase):
+    """Реплика — отдельный файл SQLite, синхронизируемый командой."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        connections.databases['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(directory, 'replica.sqlite3'),
+        }
+        connections.ensure_defaults('replica')
+        connections.prepare_test_settings('replica')
+        self.addCleanup(self.drop_replica)
+        cache.clear()
+
+    @staticmethod
+    def drop_replica():
+        connections['replica'].close()
+        del connections['replica']
+        del connections.databases['replica']
+
+    def test_feed_is_read_from_synced_replica(self):
+        """Лента читается с реплики, после записи — из основной базы."""
+        author = User.objects.create_user('author')
+        post = Post.objects.create(author=author, text='Пост на реплике')
+        call_command('replicate_sqlite', once=True, stdout=StringIO())
+        Post.objects.filter(pk=post.pk).update(
+            text='Только в основной базе',
+            text_html='<p>Только в основной базе</p>',
+        )
+        cache.clear()
+        client = Client()
+        response = client.get(INDEX_URL)
+        self.assertContains(response, 'Пост на реплике')
+        self.assertNotContains(response, 'Только в основной базе')
+        client.cookies[PIN_COOKIE] = '1'
+        cache.clear()
+        self.assertContains(client.get(INDEX_URL), 'Только в основной базе')
+
+
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user('author')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        cls.COMMENT_URL = reverse('posts:add_comment', args=(cls.post.id,))
+
+    def setUp(self):
+        cache.clear()
+        timing.samples.clear()
+        self.user = Client()
+        self.user.force_login(self.author)
+
+    @override_settings(RATELIMITS={'posts:add_comment': {'user': '2/m'}})
+    def test_user_is_limited(self):
+        """Сверх лимита пользователь получает 429 с Retry-After."""
+        for _ in range(2):
+            response = self.user.post(self.COMMENT_URL, {'text': 'Ответ'})
+            self.assertEqual(response.status_code, 302)
+        response = self.user.post(self.COMMENT_URL, {'text': 'Ответ'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertIn('ratelimit;desc="blocked"', response['Server-Timing'])
+        self.assertEqual(self.post.comments.count(), 2)
+        self.assertEqual(timing.summary()['posts:add_comment']['blocked'], 1)
+        self.assertEqual(
+            self.user.get(reverse('posts:post_create')).status_code, 200
+        )
+
+    @override_settings(RATELIMITS={'posts:add_comment': {'ip': '1/h'}})
+    def test_ip_is_limited(self):
+        """Лимит по IP общий для всех пользователей с этого адреса."""
+        self.user.post(self.COMMENT_URL, {'text': 'Ответ'})
+        self.assertEqual(
+            self.client.post(self.COMMENT_URL).status_code, 429
+        )
+        self.assertEqual(
+            self.client.post(
+                self.COMMENT_URL, REMOTE_ADDR='10.0.0.1'
+            ).status_code,
+            302
+        )
+
+    @override_settings(RATELIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_client_ip_ignores_addresses_sent_by_client(self):
+        """Адрес берется справа, по числу доверенных прокси."""
+        for proxies, header, expected in (
+            (1, '6.6.6.6, 10.0.0.1', '10.0.0.1'),
+            (2, '6.6.6.6, 10.0.0.1, 10.0.0.2', '10.0.0.1'),
+            (2, '10.0.0.1', '127.0.0.1'),
+            (1, '', '127.0.0.1'),
+        ):
+            with self.subTest(proxies=proxies, header=header):
+                with override_settings(RATELIMIT_TRUSTED_PROXIES=proxies):
+                    self.assertEqual(
+                        ratelimit.client_ip(RequestFactory().get(
+                            '/', HTTP_X_FORWARDED_FOR=header
+                        )),
+                        expected
+                    )
+
+    def test_parse(self):
+        """Частота задается как число запросов за период."""
+        for rate, expected in (
+            ('20/m', (20, 60)), ('5/10s', (5, 10)), ('100/d', (100, 86400)),
+        ):
+            with self.subTest(rate=rate):
+                self.assertEqual(ratelimit.parse(rate), expected)
+
+
+class StaticFilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        cls.settings = override_settings(STATIC_ROOT=cls.root)
+        cls.settings.enable()
+        call_command('build_static', stdout=StringIO())
+        cls.logo = staticfiles_storage.stored_name('img/logo.png')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.root, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_build_writes_hashed_and_compressed_files(self):
+        """Сборка пишет файлы с хешем в имени и сжатые варианты."""
+        self.assertRegex(self.logo, r'^img/logo\.[0-9a-f]{12}\.png$')
+        self.assertTrue(os.path.exists(
+            os.path.join(self.root, 'staticfiles.json')
+        ))
+        for suffix in ('.br', '.gz'):
+            with self.subTest(suffix=suffix):
+                self.assertTrue(os.path.exists(os.path.join(
+                    self.root, 'admin', 'css', 'base.css' + suffix
+                )))
+
+    def test_hashed_files_are_immutable(self):
+        """Файл с хешем кешируется навсегда, без хеша — перепроверяется."""
+        for name, cache_control in (
+            (self.logo, assets.IMMUTABLE),
+            ('img/logo.png', assets.REVALIDATE),
+        ):
+            with self.subTest(name=name):
+                response = self.client.get(settings.STATIC_URL + name)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Cache-Control'], cache_control)
+        url = settings.STATIC_URL + self.logo
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=self.client.get(url)['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_compressed_variant_follows_accept_encoding(self):
+        """Готовый сжатый вариант отдается только тем, кто его принимает."""
+        url = settings.STATIC_URL + staticfiles_storage.stored_name(
+            'admin/css/base.css'
+        )
+        for header, encoding in (
+            ('gzip, deflate, br', 'br'), ('gzip, deflate', 'gzip'),
+            ('gzip;q=0', None), ('', None),
+        ):
+            with self.subTest(header=header):
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING=header)
+                self.assertEqual(response.get('Content-Encoding'), encoding)
+                self.assertEqual(response['Content-Type'], 'text/css')
+                self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_paths_outside_static_root_are_not_served(self):
+        """Пути вне STATIC_ROOT и несуществующие файлы дают 404."""
+        for name in ('../manage.py', 'img/missing.png'):
+            with self.subTest(name=name):
+                self.assertEqual(
+                    self.client.get(settings.STATIC_URL + name).status_code,
+                    404
+                )
+
+
+class MediaFilesTests(TestCase):
+    URL = settings.MEDIA_URL + 'posts/small.gif'
+    DATA = b'0123456789'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        cls.settings = override_settings(MEDIA_ROOT=cls.root)
+        cls.settings.enable()
+        os.makedirs(os.path.join(cls.root, 'posts'))
+        with open(os.path.join(cls.root, 'posts', 'small.gif'), 'wb') as f:
+            f.write(cls.DATA)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.root, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_file_is_served_with_validators(self):
+        """Файл отдается с ETag и Last-Modified, повтор получает 304."""
+        response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.DATA)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        for header, value in (
+            ('HTTP_IF_NONE_MATCH', response['ETag']),
+            ('HTTP_IF_MODIFIED_SINCE', response['Last-Modified']),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(
+                    self.client.get(self.URL, **{header: value}).status_code,
+                    304
+                )
+
+    def test_byte_ranges(self):
+        """Range отдает часть файла, диапазон вне файла — 416."""
+        etag = self.client.get(self.URL)['ETag']
+        for headers, status, body in (
+            ({'HTTP_RANGE': 'bytes=2-5'}, 206, b'2345'),
+            ({'HTTP_RANGE': 'bytes=7-'}, 206, b'789'),
+            ({'HTTP_RANGE': 'bytes=-3'}, 206, b'789'),
+            ({'HTTP_RANGE': 'bytes=8-100'}, 206, b'89'),
+            ({'HTTP_RANGE': 'bytes=2-5', 'HTTP_IF_RANGE': etag}, 206, b'2345'),
+            ({'HTTP_RANGE': 'bytes=2-5', 'HTTP_IF_RANGE': '"old"'}, 200,
+             self.DATA),
+            ({'HTTP_RANGE': 'bytes=0-1,4-5'}, 200, self.DATA),
+            ({'HTTP_RANGE': 'bytes=10-'}, 416, b''),
+        ):
+            with self.subTest(headers=headers):
+                response = self.client.get(self.URL, **headers)
+                self.assertEqual(response.status_code, status)
+                content = (
+                    b''.join(response.streaming_content)
+                    if response.streaming else response.content
+                )
+                self.assertEqual(content, body)
+        self.assertEqual(
+            self.client.get(self.URL, HTTP_RANGE='bytes=2-5')[
+                'Content-Range'
+            ],
+            'bytes 2-5/10'
+        )
+
+    def test_transfer_is_handed_to_proxy(self):
+        """С MEDIA_SENDFILE тело файла отдает прокси, а не Django."""
+        for sendfile, header, value in (
+            ('x-accel-redirect', 'X-Accel-Redirect',
+             '/protected-media/posts/small.gif'),
+            ('x-sendfile', 'X-Sendfile',
+             os.path.join(self.root, 'posts', 'small.gif')),
+        ):
+            with self.subTest(sendfile=sendfile):
+                with override_settings(MEDIA_SENDFILE=sendfile):
+                    response = self.client.get(self.URL)
+                self.assertEqual(response[header], value)
+                self.assertEqual(response.content, b'')
+                self.assertIn('ETag', response)
+
+    def test_paths_outside_media_root_are_not_served(self):
+        """Пути вне MEDIA_ROOT, каталоги и несуществующие файлы дают 404."""
+        for name in ('../manage.py', 'posts', 'posts/missing.gif'):
+            with self.subTest(name=name):
+                self.assertEqual(
+                    self.client.get(settings.MEDIA_URL + name).status_code,
+                    404
+                )
@@ -0,0 +1,158 @@
+"""Учёт времени запроса: SQL, шаблоны, миниатюры и общее время.
+
+Замеры текущего запроса лежат в thread-local ``Timings``; по завершении
+запроса они попадают в скользящее окно ``samples`` по имени маршрута.
+"""
+import functools
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.template.base import Template
+
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+PERCENTILES = (50, 95, 99)
+
+local = threading.local()
+lock = threading.Lock()
+samples = {}
+
+
+class Timings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.thumbnails = 0.0
+        self.templates = defaultdict(float)
+        self.blocked = False
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db += time.perf_counter() - started
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def header(self):
+        metrics = [
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'thumbnails;dur={self.thumbnails * 1000:.1f}',
+        ]
+        metrics += [
+            f'tpl;dur={spent * 1000:.1f};desc="{name}"'
+            for name, spent in self.templates.items()
+        ]
+        if self.blocked:
+            metrics.append('ratelimit;desc="blocked"')
+        metrics.append(f'total;dur={self.total * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+def current():
+    return getattr(local, 'timings', None)
+
+
+def start():
+    local.timings = Timings()
+    return local.timings
+
+
+def stop():
+    timings, local.timings = current(), None
+    if timings is not None:
+        timings.finish()
+    return timings
+
+
+def record(name, timings):
+    with lock:
+        if name not in samples:
+            samples[name] = deque(maxlen=settings.TIMING_WINDOW)
+        samples[name].append((
+            timings.total * 1000,
+            timings.db * 1000,
+            timings.queries,
+            timings.blocked,
+        ))
+
+
+def percentiles(values):
+    values = sorted(values)
+    return {
+        f'p{percent}': round(
+            values[min(len(values) - 1, len(values) * percent // 100)], 1
+        )
+        for percent in PERCENTILES
+    }
+
+
+def histogram(values):
+    counts = dict.fromkeys([*map(str, BUCKETS), '+Inf'], 0)
+    for value in values:
+        bucket = next((edge for edge in BUCKETS if value <= edge), '+Inf')
+        counts[str(bucket)] += 1
+    return counts
+
+
+def summary():
+    with lock:
+        snapshot = {name: list(rows) for name, rows in samples.items()}
+    result = {}
+    for name, rows in sorted(snapshot.items()):
+        total, db, queries, blocked = zip(*rows)
+        result[name] = {
+            'count': len(rows),
+            'blocked': sum(blocked),
+            'total_ms': percentiles(total),
+            'db_ms': percentiles(db),
+            'queries': percentiles(queries),
+            'histogram_ms': histogram(total),
+        }
+    return result
+
+
+def timed(add):
+    """Оборачивает функцию замером, только пока идёт учёт запроса."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            timings = current()
+            if timings is None:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                add(timings, args, time.perf_counter() - started)
+        wrapper.timed = True
+        return wrapper
+    return decorator
+
+
+def add_template(timings, args, spent):
+    template = args[0]
+    timings.templates[template.name or '<string>'] += spent
+
+
+def add_thumbnail(timings, args, spent):
+    timings.thumbnails += spent
+
+
+def install():
+    """Подключает замеры к рендеру шаблонов и к sorl-thumbnail."""
+    from sorl.thumbnail.base import ThumbnailBackend
+
+    for owner, attribute, add in (
+        (Template, 'render', add_template),
+        (ThumbnailBackend, 'get_thumbnail', add_thumbnail),
+    ):
+        function = getattr(owner, attribute)
+        if not getattr(function, 'timed', False):
+            setattr(owner, attribute, timed(add)(function))
@@ -1,4 +1,23 @@
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseNotModified, JsonResponse
+)
 from django.shortcuts import render
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from . import assets, files, timing
+
+SENDFILE_HEADERS = ('x-accel-redirect', 'x-sendfile')
 
 
 def page_not_found(request, exception):
@@ -11,3 +30,82 @@ def csrf_failure(request, reason=''):
 
 def internal_server_error(request):
     return render(request, 'core/500.html')
+
+
+def too_many_requests(request):
+    return render(request, 'core/429.html', status=429)
+
+
+@staff_member_required
+def timings(request):
+    return JsonResponse(timing.summary())
+
+
+def static_file(request, path):
+    """Собранная статика: готовый сжатый вариант, вечный кеш для хешей."""
+    full_path = files.resolve(settings.STATIC_ROOT, path)
+    stat = os.stat(full_path)
+    if was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime,
+        stat.st_size
+    ):
+        file_path, coding = assets.variant(
+            full_path, request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        content_type, _ = mimetypes.guess_type(full_path)
+        response = FileResponse(
+            open(file_path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if coding:
+            response['Content-Encoding'] = coding
+    else:
+        response = HttpResponseNotModified()
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = (
+        assets.IMMUTABLE if staticfiles_storage.is_immutable(path)
+        else assets.REVALIDATE
+    )
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def media_file(request, path):
+    """Загруженные файлы: 304 по валидаторам, диапазоны, отдача прокси.
+
+    При MEDIA_SENDFILE тело отдает фронтовой прокси по заголовку
+    X-Accel-Redirect (nginx) или X-Sendfile (Apache, lighttpd).
+    """
+    full_path = files.resolve(settings.MEDIA_ROOT, path)
+    stat = os.stat(full_path)
+    tag = files.etag(stat)
+    response = get_conditional_response(
+        request, etag=tag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        content_type = (
+            mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        )
+        sendfile = settings.MEDIA_SENDFILE
+        if sendfile not in (None, *SENDFILE_HEADERS):
+            raise ValueError(f'Неизвестный MEDIA_SENDFILE: {sendfile!r}')
+        if sendfile == 'x-accel-redirect':
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(
+                os.path.relpath(full_path, settings.MEDIA_ROOT).replace(
+                    os.sep, '/'
+                )
+            )
+        elif sendfile == 'x-sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = full_path
+        else:
+            response = files.content(
+                request, full_path, stat, tag, content_type
+            )
+    response['ETag'] = tag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    patch_cache_control(
+        response, public=True, max_age=settings.MEDIA_CACHE_SECONDS
+    )
+    return response
@@ -0,0 +1,83 @@
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Количество процессов-воркеров.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float,
+            default=settings.JOBS_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, concurrency, poll_interval, once, **options):
+        if once:
+            done = queue.run_pending()
+            self.stdout.write(self.style.SUCCESS(f'Выполнено задач: {done}'))
+            return
+        if concurrency == 1:
+            while True:
+                try:
+                    queue.work(poll_interval)
+                except Exception:
+                    self.stderr.write(
+                        'Воркер упал:\n' + traceback.format_exc()
+                    )
+                    connections.close_all()
+                    time.sleep(poll_interval)
+        while True:
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=concurrency, initializer=django.setup
+            ) as pool:
+                self.supervise(pool, concurrency, poll_interval)
+
+    def supervise(self, pool, concurrency, poll_interval):
+        """Перезапускает упавших воркеров, пока пул процессов исправен.
+
+        Если процесс пула убит, пул ломается целиком: метод возвращается,
+        и handle создает новый пул.
+        """
+        futures = {
+            pool.submit(queue.work, poll_interval) for _ in range(concurrency)
+        }
+        while True:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    self.stderr.write('Воркер остановился без ошибки')
+                    continue
+                self.stderr.write('Воркер упал:\n' + ''.join(
+                    traceback.format_exception(
+                        type(error), error, error.__traceback__
+                    )
+                ))
+                if isinstance(error, BrokenProcessPool):
+                    return
+            time.sleep(poll_interval)
+            try:
+                futures |= {
+                    pool.submit(queue.work, poll_interval) for _ in done
+                }
+            except BrokenProcessPool:
+                return
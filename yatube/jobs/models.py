@@ -0,0 +1,67 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        max_length=100,
+        verbose_name='Задача'
+    )
+    payload = models.TextField(
+        default='{}',
+        verbose_name='Параметры'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Запустить после'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создана'
+    )
+    started = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Начата'
+    )
+    finished = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Завершена'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка'
+    )
+
+    class Meta:
+        ordering = ('run_at',)
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}: {self.get_status_display()}'
@@ -0,0 +1,140 @@
+import json
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+HANDLERS = {}
+
+
+def register(name):
+    """Регистрирует обработчик задачи под именем name."""
+    def decorator(handler):
+        HANDLERS[name] = handler
+        return handler
+    return decorator
+
+
+def enqueue(name, delay=0, **payload):
+    """Ставит задачу в очередь в рамках текущей транзакции."""
+    return Job.objects.create(
+        name=name,
+        payload=json.dumps(payload),
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def claim():
+    """Забирает одну готовую к запуску задачу или возвращает None.
+
+    Там, где база умеет SELECT ... FOR UPDATE SKIP LOCKED, задача
+    блокируется строкой; в SQLite её захватывает условный UPDATE,
+    который проходит только у одного из конкурирующих воркеров.
+    """
+    now = timezone.now()
+    ready = Job.objects.filter(
+        status=Job.PENDING, run_at__lte=now
+    ).order_by('run_at', 'pk')
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = ready.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status = Job.RUNNING
+            job.started = now
+            job.attempts += 1
+            job.save(update_fields=('status', 'started', 'attempts'))
+            return job
+    for pk in ready.values_list('pk', flat=True)[:settings.JOBS_CLAIM_BATCH]:
+        if Job.objects.filter(pk=pk, status=Job.PENDING).update(
+            status=Job.RUNNING, started=now, attempts=F('attempts') + 1
+        ):
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def retry_or_fail(job, error):
+    """Откладывает повтор с нарастающей паузой или помечает ошибкой."""
+    job.error = error
+    if job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+        job.status = Job.FAILED
+        job.finished = timezone.now()
+    else:
+        job.status = Job.PENDING
+        job.run_at = timezone.now() + timedelta(
+            seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+
+
+def save_result(job):
+    """Сохраняет итог, если задачу тем временем не вернули в очередь."""
+    return Job.objects.filter(
+        pk=job.pk, status=Job.RUNNING, started=job.started
+    ).update(
+        status=job.status, run_at=job.run_at, finished=job.finished,
+        error=job.error,
+    )
+
+
+def run(job):
+    """Выполняет задачу; при ошибке откладывает повтор с нарастающей паузой."""
+    try:
+        HANDLERS[job.name](**json.loads(job.payload))
+    except Exception:
+        retry_or_fail(job, traceback.format_exc())
+    else:
+        job.status = Job.DONE
+        job.finished = timezone.now()
+        job.error = ''
+    save_result(job)
+
+
+def release_stale():
+    """Возвращает в очередь задачи, чей воркер пропал; отдает их число.
+
+    Задача, начатая раньше JOBS_LEASE_SECONDS назад, считается попыткой,
+    оборвавшейся ошибкой.
+    """
+    expired = timezone.now() - timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+    released = 0
+    for job in Job.objects.filter(status=Job.RUNNING, started__lt=expired):
+        retry_or_fail(job, 'Воркер не завершил задачу за JOBS_LEASE_SECONDS')
+        released += save_result(job)
+    return released
+
+
+def purge_done():
+    """Удаляет задачи, выполненные раньше JOBS_KEEP_DONE_SECONDS назад."""
+    expired = timezone.now() - timedelta(
+        seconds=settings.JOBS_KEEP_DONE_SECONDS
+    )
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE, finished__lt=expired
+    ).delete()
+    return deleted
+
+
+def run_pending():
+    """Выполняет все готовые задачи и возвращает их количество."""
+    release_stale()
+    purge_done()
+    done = 0
+    job = claim()
+    while job is not None:
+        run(job)
+        done += 1
+        job = claim()
+    return done
+
+
+def work(poll_interval):
+    """Бесконечный цикл воркера."""
+    while True:
+        if not run_pending():
+            time.sleep(poll_interval)
@@ -0,0 +1,116 @@
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import queue
+from .management.commands.run_workers import Command
+from .models import Job
+
+CALLS = []
+
+
+@queue.register('tests.record')
+def record(value):
+    CALLS.append(value)
+
+
+@queue.register('tests.fail')
+def fail():
+    raise ValueError('Ошибка задачи')
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_pending_jobs_are_run(self):
+        """Готовые задачи выполняются, отложенные ждут своего времени."""
+        job = queue.enqueue('tests.record', value=1)
+        delayed = queue.enqueue('tests.record', delay=60, value=2)
+        call_command('run_workers', once=True, stdout=StringIO())
+        self.assertEqual(CALLS, [1])
+        job.refresh_from_db()
+        delayed.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(delayed.status, Job.PENDING)
+
+    @override_settings(JOBS_MAX_ATTEMPTS=2, JOBS_RETRY_DELAY=0)
+    def test_failed_job_is_retried(self):
+        """Упавшая задача повторяется и помечается ошибкой."""
+        job = queue.enqueue('tests.fail')
+        queue.run(queue.claim())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertIn('Ошибка задачи', job.error)
+        queue.run(queue.claim())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNone(queue.claim())
+
+    def test_job_is_claimed_once(self):
+        """Задачу забирает только один воркер."""
+        queue.enqueue('tests.record', value=1)
+        self.assertIsNotNone(queue.claim())
+        self.assertIsNone(queue.claim())
+
+    @override_settings(JOBS_RETRY_DELAY=0)
+    def test_stale_running_job_is_released(self):
+        """Задача упавшего воркера по истечении срока снова в очереди."""
+        job = queue.enqueue('tests.record', value=1)
+        stale = queue.claim()
+        queue.run_pending()
+        self.assertEqual(CALLS, [])
+        Job.objects.filter(pk=job.pk).update(
+            started=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(CALLS, [1])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.attempts, 2)
+        queue.run(stale)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(CALLS, [1, 1])
+
+    def test_old_done_jobs_are_purged(self):
+        """Давно выполненные задачи удаляются, упавшие остаются."""
+        old = timezone.now() - timedelta(days=2)
+        done = queue.enqueue('tests.record', value=1)
+        failed = queue.enqueue('tests.fail')
+        Job.objects.filter(pk=done.pk).update(status=Job.DONE, finished=old)
+        Job.objects.filter(pk=failed.pk).update(
+            status=Job.FAILED, finished=old
+        )
+        recent = queue.enqueue('tests.record', value=2)
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(
+            set(Job.objects.values_list('pk', flat=True)),
+            {failed.pk, recent.pk}
+        )
+
+    def test_crashed_worker_is_restarted(self):
+        """Упавший воркер логируется и запускается снова."""
+        stderr = StringIO()
+        with ThreadPoolExecutor(max_workers=1) as pool, mock.patch.object(
+            queue, 'work', side_effect=RuntimeError('Нет базы')
+        ) as work:
+            submit = pool.submit
+
+            def break_after_restart(*args):
+                if work.call_count >= 2:
+                    raise BrokenProcessPool
+                return submit(*args)
+
+            pool.submit = break_after_restart
+            Command(stderr=stderr).supervise(pool, 1, 0)
+        self.assertEqual(work.call_count, 2)
+        self.assertEqual(stderr.getvalue().count('RuntimeError: Нет базы'), 2)
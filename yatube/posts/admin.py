@@ -1,10 +1,25 @@
 from django.contrib import admin
 
+from . import search
 from .models import Comment, Follow, Group, Post
 
 
+class FullTextSearchMixin:
+    search_table = None
+    search_limit = 1000
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not search.enabled():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(pk__in=search.matching_ids(
+            self.search_table, search_term, self.search_limit
+        )), False
+
+
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = (
         'pk',
         'text',
@@ -14,6 +29,7 @@ class PostAdmin(admin.ModelAdmin):
         'image',
     )
     search_fields = ('text',)
+    search_table = 'posts_post'
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
     list_editable = ('group',)
@@ -26,13 +42,14 @@ class GroupAdmin(admin.ModelAdmin):
         'title',
         'slug',
         'description',
+        'post_count',
     )
     search_fields = ('title',)
     empty_value_display = '-пусто'
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = (
         'post',
         'author',
@@ -40,6 +57,7 @@ class CommentAdmin(admin.ModelAdmin):
         'created',
     )
     search_fields = ('text',)
+    search_table = 'posts_comment'
     list_filter = ('created',)
 
 
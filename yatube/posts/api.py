@@ -0,0 +1,173 @@
+"""JSON-API лент только для чтения.
+
+Строки берутся через ``.values()`` без создания моделей, страницы —
+тем же ``CursorPaginator`` с параметрами ``?cursor=`` и ``?limit=``,
+а ответ отдаётся потоком по одному посту.
+"""
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+
+from core.paginator import CursorPaginator
+from users import lookup
+
+from . import conditional, groups
+from .models import Comment, Post, PostQuerySet, parse_thumbnails
+
+
+def dumps(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def error(detail, status):
+    return JsonResponse(
+        {'detail': detail},
+        status=status,
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def login_required(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error('Требуется вход', 401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def author(row, prefix=''):
+    return {
+        'username': row[f'{prefix}author__username'],
+        'name': ' '.join(filter(None, (
+            row[f'{prefix}author__first_name'],
+            row[f'{prefix}author__last_name'],
+        ))),
+    }
+
+
+def serialize_post(row, prefix=''):
+    image = row[f'{prefix}image']
+    group = row[f'{prefix}group__slug']
+    return {
+        'id': row[f'{prefix}id'],
+        'text': row[f'{prefix}text'],
+        'pub_date': row[f'{prefix}pub_date'],
+        'author': author(row, prefix),
+        'group': group and {
+            'slug': group, 'title': row[f'{prefix}group__title']
+        },
+        'image': default_storage.url(image) if image else None,
+        'thumbnails': parse_thumbnails(row[f'{prefix}thumbnails']),
+    }
+
+
+def serialize_entry(row):
+    return serialize_post(row, 'post__')
+
+
+def serialize_comment(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'created': row['created'],
+        'author': author(row),
+    }
+
+
+def get_page(queryset, request, per_page=None, order_field='pub_date'):
+    per_page = per_page or settings.POSTS_PER_PAGE
+    try:
+        limit = int(request.GET.get('limit', per_page))
+    except ValueError:
+        limit = per_page
+    return CursorPaginator(
+        queryset,
+        min(max(limit, 1), settings.API_MAX_PAGE_SIZE),
+        order_field=order_field,
+    ).get_page(request.GET.get('page'), request.GET.get('cursor'))
+
+
+def stream(page, serialize, **extra):
+    """Тело ответа: курсоры и extra, затем results по одной записи."""
+    yield dumps({
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+        **extra,
+    })[:-1] + ', "results": ['
+    for number, row in enumerate(page):
+        yield (', ' if number else '') + dumps(serialize(row))
+    yield ']}'
+
+
+def page_response(page, serialize=serialize_post, **extra):
+    return StreamingHttpResponse(
+        stream(page, serialize, **extra), content_type='application/json'
+    )
+
+
+@conditional.index
+def index(request):
+    return page_response(get_page(Post.objects.feed_values(), request))
+
+
+@conditional.group_posts
+def group_posts(request, slug):
+    group = groups.get(slug)
+    if group is None:
+        return error('Группа не найдена', 404)
+    return page_response(
+        get_page(group.posts.feed_values(), request),
+        group={
+            'slug': group.slug,
+            'title': group.title,
+            'description': group.description,
+            'post_count': group.post_count,
+        },
+    )
+
+
+@conditional.profile
+def profile(request, username):
+    found = lookup.by_username(username)
+    if found is None:
+        return error('Автор не найден', 404)
+    return page_response(
+        get_page(
+            Post.objects.filter(author_id=found.pk).feed_values(), request
+        ),
+        author={'username': found.username, 'name': found.get_full_name()},
+    )
+
+
+@login_required
+@conditional.follow_index
+def follow_index(request):
+    entries = request.user.timeline.values(
+        'id',
+        'pub_date',
+        'post__id',
+        *(f'post__{field}' for field in PostQuerySet.FEED_FIELDS),
+    )
+    return page_response(get_page(entries, request), serialize_entry)
+
+
+@conditional.post_detail
+def post_detail(request, post_id):
+    post = Post.objects.filter(pk=post_id).feed_values().first()
+    if post is None:
+        return error('Пост не найден', 404)
+    return page_response(
+        get_page(
+            Comment.objects.filter(post_id=post_id).feed_values(),
+            request,
+            per_page=settings.COMMENTS_PER_PAGE,
+            order_field='created',
+        ),
+        serialize_comment,
+        post=serialize_post(post),
+    )
@@ -0,0 +1,95 @@
+import hashlib
+from datetime import datetime, timezone
+
+from django.views.decorators.http import condition
+
+from users import lookup
+
+from . import groups, versions
+from .models import Post
+
+
+def version_time(version):
+    return datetime.fromtimestamp(int(version, 16) / 10 ** 9, timezone.utc)
+
+
+def feed_condition(feeds):
+    """ETag и Last-Modified по версиям лент, которые вернула feeds.
+
+    Если feeds вернула None (объекта нет), валидаторы не выставляются
+    и представление отвечает как обычно. Версию 'authors' меняет смена
+    имени любого пользователя: имена авторов постов и комментариев
+    видны на всех страницах, кроме профиля.
+    """
+    def get_versions(request, *args, **kwargs):
+        if not hasattr(request, 'feed_versions'):
+            names = feeds(request, *args, **kwargs)
+            request.feed_versions = (
+                None if names is None else versions.get(*names)
+            )
+        return request.feed_versions
+
+    def etag(request, *args, **kwargs):
+        found = get_versions(request, *args, **kwargs)
+        if found is None:
+            return None
+        return hashlib.md5(':'.join(
+            (str(request.user.pk or ''), *found)
+        ).encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        found = get_versions(request, *args, **kwargs)
+        return max(map(version_time, found)) if found else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def viewer_feeds(request):
+    if request.user.is_authenticated:
+        return (f'follow:{request.user.pk}',)
+    return ()
+
+
+@feed_condition
+def index(request):
+    return ('groups', 'authors', 'index')
+
+
+@feed_condition
+def group_posts(request, slug):
+    group = groups.get(slug)
+    if group is None:
+        return None
+    return ('groups', 'authors', f'group:{group.pk}')
+
+
+@feed_condition
+def profile(request, username):
+    author = lookup.by_username(username)
+    if author is None:
+        return None
+    return ('groups', f'profile:{author.pk}', *viewer_feeds(request))
+
+
+@feed_condition
+def post_detail(request, post_id):
+    author_id = Post.objects.filter(pk=post_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    return (
+        'groups', 'authors', f'post:{post_id}', f'profile:{author_id}'
+    )
+
+
+def follow_feeds(request):
+    """Ленты подписок зрителя; запрос делается один раз на запрос."""
+    if not hasattr(request, 'follow_feeds'):
+        request.follow_feeds = versions.follow_feeds(request.user.pk)
+    return request.follow_feeds
+
+
+@feed_condition
+def follow_index(request):
+    return ('groups', 'authors', *follow_feeds(request))
@@ -0,0 +1,80 @@
+"""Группы по slug и их счетчик постов.
+
+Группа ищется сначала в локальном LRU процесса, затем в общем кэше и
+лишь потом в базе. Записи обоих кэшей привязаны к версии 'groups',
+поэтому правка группы сразу сбрасывает их во всех процессах. Число
+постов в закэшированной группе может отставать не больше чем на
+GROUP_CACHE_TIMEOUT.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404
+
+from . import versions
+from .models import Group, Post
+
+KEY = 'posts:group:{}:{}'
+
+lock = threading.Lock()
+recent = OrderedDict()
+
+
+def remember(slug, version, group):
+    with lock:
+        recent[slug] = (
+            version, time.monotonic() + settings.GROUP_CACHE_TIMEOUT, group
+        )
+        recent.move_to_end(slug)
+        while len(recent) > settings.GROUP_CACHE_SIZE:
+            recent.popitem(last=False)
+
+
+def get(slug):
+    """Группа по slug или None, если такой нет."""
+    version, = versions.get('groups')
+    with lock:
+        found = recent.get(slug)
+        if found and found[0] == version and found[1] > time.monotonic():
+            recent.move_to_end(slug)
+            return found[2]
+    key = KEY.format(version, slug)
+    group = cache.get(key)
+    if group is None:
+        try:
+            group = Group.objects.get(slug=slug)
+        except Group.DoesNotExist:
+            return None
+        cache.set(key, group, settings.GROUP_CACHE_TIMEOUT)
+    remember(slug, version, group)
+    return group
+
+
+def get_or_404(slug):
+    group = get(slug)
+    if group is None:
+        raise Http404('Группа не найдена')
+    return group
+
+
+def change(group_id, delta):
+    """Атомарно сдвигает счетчик постов группы на delta."""
+    if group_id is None:
+        return
+    groups = Group.objects.filter(pk=group_id)
+    if delta < 0:
+        groups = groups.filter(post_count__gte=-delta)
+    groups.update(post_count=F('post_count') + delta)
+
+
+def recount():
+    """Пересчитывает счетчики постов всех групп; возвращает число групп."""
+    counts = Post.objects.filter(group=OuterRef('pk')).order_by().values(
+        'group'
+    ).annotate(total=Count('pk')).values('total')
+    return Group.objects.update(post_count=Coalesce(Subquery(counts), 0))
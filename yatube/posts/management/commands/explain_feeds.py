@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.paginator import CursorPaginator
+from posts import timeline
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает планы запросов лент: первая страница и переход по '
+        'курсору для каждого представления.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', help='slug группы.')
+        parser.add_argument('--author', help='username автора.')
+        parser.add_argument('--user', help='username подписчика.')
+        parser.add_argument('--post', type=int, help='id поста.')
+
+    def handle(self, *args, **options):
+        group = self.pick(Group, 'slug', options['group'])
+        author = self.pick(User, 'username', options['author'])
+        user = self.pick(
+            User, 'username', options['user'],
+            default=Follow.objects.values('user').first(),
+        )
+        post = self.pick(Post, 'pk', options['post'])
+        feeds = [
+            ('index', Post.objects.feed(), 'pub_date'),
+            ('api_index', Post.objects.feed_values(), 'pub_date'),
+        ]
+        if group:
+            feeds.append(('group_posts', group.posts.feed(), 'pub_date'))
+        if author:
+            feeds.append(('profile', author.posts.feed(), 'pub_date'))
+        if user:
+            feeds.append(
+                ('follow_index', timeline.entries(user), 'pub_date')
+            )
+        if author:
+            feeds.append((
+                'post_save followers',
+                Follow.objects.filter(author=author).values_list('user_id'),
+                None,
+            ))
+        if post:
+            feeds.append((
+                'post_detail comments',
+                Comment.objects.filter(post=post).feed(),
+                'created',
+            ))
+        for name, queryset, order_field in feeds:
+            self.explain(name, queryset, order_field)
+
+    def pick(self, model, field, value, default=None):
+        if value is None:
+            found = default or model.objects.order_by('pk').first()
+            if isinstance(found, dict):
+                return model.objects.get(pk=found['user'])
+            return found
+        try:
+            return model.objects.get(**{field: value})
+        except model.DoesNotExist:
+            raise CommandError(f'{model.__name__} {value} не найден')
+
+    def explain(self, name, queryset, order_field):
+        if order_field is None:
+            self.show(name, queryset)
+            return
+        paginator = CursorPaginator(
+            queryset, settings.POSTS_PER_PAGE, order_field=order_field
+        )
+        self.show(
+            f'{name}: первая страница',
+            paginator.ordered()[:paginator.per_page + 1],
+        )
+        self.show(
+            f'{name}: страница по курсору',
+            paginator.seek(timezone.now(), 0)[:paginator.per_page + 1],
+        )
+
+    def show(self, title, queryset):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(queryset.explain())
+        self.stdout.write('')
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, группы, посты, комментарии и подписки '
+        'в NDJSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', help='Файл выгрузки (по умолчанию stdout).'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, output, chunk_size, **options):
+        if output is None:
+            written = transfer.dump(self.stdout, chunk_size)
+        else:
+            with open(output, 'w', encoding='utf-8') as stream:
+                written = transfer.dump(stream, chunk_size)
+        self.stderr.write(f'Выгружено записей: {written}')
@@ -0,0 +1,72 @@
+import os
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from posts import search, transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает NDJSON-выгрузку пачками bulk_create. Прогресс '
+        'сохраняется в файл контрольной точки, прерванная загрузка '
+        'продолжается с него.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки (по умолчанию <path>.checkpoint).',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать сначала, не глядя на контрольную точку.',
+        )
+
+    def handle(self, *args, path, batch_size, checkpoint, restart,
+               **options):
+        checkpoint = checkpoint or path + '.checkpoint'
+        start = 0
+        if not restart and os.path.exists(checkpoint):
+            with open(checkpoint) as stream:
+                start = int(stream.read().strip() or 0)
+            self.stdout.write(f'Продолжаем после строки {start}')
+        loaded = 0
+        try:
+            with open(path, encoding='utf-8') as lines, transfer.keep_dates():
+                for line, model, objects in transfer.batches(
+                    lines, batch_size, start
+                ):
+                    with transaction.atomic():
+                        model._default_manager.bulk_create(
+                            objects, ignore_conflicts=True
+                        )
+                    with open(checkpoint, 'w') as stream:
+                        stream.write(str(line))
+                    loaded += len(objects)
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        self.finish()
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(f'Загружено записей: {loaded}'))
+
+    def finish(self):
+        """Работа, которую при обычном сохранении делают сигналы."""
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), transfer.MODELS
+            ):
+                cursor.execute(sql)
+        commands = ['rebuild_timelines', 'recount_stats']
+        if search.enabled():
+            commands.append('rebuild_search_index')
+        for command in commands:
+            call_command(command, stdout=StringIO())
+        cache.clear()
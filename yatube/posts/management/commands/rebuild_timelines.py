@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import timeline
+from posts.models import Follow, TimelineEntry
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает ленты подписок всех пользователей.'
+
+    def handle(self, *args, **options):
+        TimelineEntry.objects.all().delete()
+        users = Follow.objects.values_list('user_id', flat=True).distinct()
+        rebuilt = 0
+        for user_id in users.iterator():
+            with transaction.atomic():
+                timeline.rebuild(user_id)
+            rebuilt += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересобрано лент: {rebuilt}')
+        )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import groups, stats
+from posts.models import User, UserStats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счетчики постов, подписок и комментариев '
+        'пользователей и счетчики постов групп.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, batch_size, **options):
+        counts = stats.count()
+        existing = UserStats.objects.in_bulk()
+        missing = []
+        drifted = []
+        for user_id in User.objects.values_list('pk', flat=True).iterator():
+            values = counts[user_id]
+            current = existing.get(user_id)
+            if current is None:
+                missing.append(UserStats(user_id=user_id, **values))
+                continue
+            if any(
+                getattr(current, field) != value
+                for field, value in values.items()
+            ):
+                for field, value in values.items():
+                    setattr(current, field, value)
+                drifted.append(current)
+        with transaction.atomic():
+            UserStats.objects.bulk_create(missing, batch_size=batch_size)
+            UserStats.objects.bulk_update(
+                drifted, stats.FIELDS, batch_size=batch_size
+            )
+            groups.recount()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: {len(missing)}, исправлено: {len(drifted)}'
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts import text
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет готовый HTML текста постов и комментариев там, где '
+        'его нет; с --all пересобирает его у всех записей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--all', action='store_true', dest='everything',
+            help='Пересобрать HTML у всех записей, а не только у пустых.',
+        )
+
+    def handle(self, *args, batch_size, everything, **options):
+        for model in (Post, Comment):
+            updated = text.backfill(model, batch_size, everything)
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: обновлено {updated}'
+            ))
@@ -0,0 +1,53 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def fill_stats(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserStats = apps.get_model('posts', 'UserStats')
+    stats = {
+        user_id: UserStats(user_id=user_id)
+        for user_id in User.objects.values_list('pk', flat=True)
+    }
+    for field, model, key in (
+        ('posts', 'Post', 'author'),
+        ('comments', 'Comment', 'author'),
+        ('followers', 'Follow', 'author'),
+        ('following', 'Follow', 'user'),
+    ):
+        rows = apps.get_model('posts', model).objects.order_by().values_list(
+            key
+        ).annotate(total=Count('pk'))
+        for user_id, total in rows:
+            setattr(stats[user_id], field, total)
+    UserStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0015_auto_20261018_0502'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('posts', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+                ('followers', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+                ('following', models.PositiveIntegerField(default=0, verbose_name='Подписок')),
+                ('comments', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+            ],
+            options={
+                'verbose_name': 'Статистика пользователя',
+                'verbose_name_plural': 'Статистика пользователей',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:31
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_post_counts(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    counts = Post.objects.filter(group=OuterRef('pk')).order_by().values(
+        'group'
+    ).annotate(total=Count('pk')).values('total')
+    Group.objects.update(post_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_auto_20261018_0509'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Постов'),
+        ),
+        migrations.RunPython(fill_post_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:29
+
+from django.db import migrations, models
+from django.utils.html import linebreaks
+
+
+def fill_text_html(apps, schema_editor):
+    for name in ('Post', 'Comment'):
+        model = apps.get_model('posts', name)
+        queryset = model.objects.order_by('pk').only('text', 'text_html')
+        last = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last)[:1000])
+            if not chunk:
+                break
+            for instance in chunk:
+                instance.text_html = linebreaks(
+                    instance.text, autoescape=True
+                )
+            model.objects.bulk_update(chunk, ['text_html'])
+            last = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_auto_20261018_0524'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Комментарий в HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(fill_text_html, migrations.RunPython.noop),
+    ]
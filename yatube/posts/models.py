@@ -1,5 +1,10 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils.functional import cached_property
+
+from .text import render as render_text
 
 User = get_user_model()
 
@@ -16,6 +21,11 @@ class Group(models.Model):
     description = models.TextField(
         verbose_name='Описание'
     )
+    post_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Постов'
+    )
 
     class Meta:
         verbose_name = 'Группа'
@@ -25,11 +35,73 @@ class Group(models.Model):
         return self.title
 
 
-class Post(models.Model):
+def parse_thumbnails(value):
+    """Адреса миниатюр из поля thumbnails; мусор даёт пустой словарь."""
+    try:
+        urls = json.loads(value)
+    except ValueError:
+        return {}
+    return urls if isinstance(urls, dict) else {}
+
+
+class RenderedTextMixin:
+    """Хранит готовый HTML текста в text_html, обновляя его при save()."""
+
+    def render_html(self):
+        self.text_html = render_text(self.text)
+
+    def save(self, *args, **kwargs):
+        self.render_html()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'text_html'}
+        super().save(*args, **kwargs)
+
+
+class PostQuerySet(models.QuerySet):
+    FEED_FIELDS = (
+        'text',
+        'text_html',
+        'pub_date',
+        'image',
+        'thumbnails',
+        'author__username',
+        'author__first_name',
+        'author__last_name',
+        'group__title',
+        'group__slug',
+    )
+
+    def feed(self, with_author=True):
+        """Посты для карточек лент: автор и группа одним запросом.
+
+        Без with_author автор не подтягивается: ленте одного автора
+        его подставляет представление.
+        """
+        if not with_author:
+            return self.select_related('group').only('author', 'group', *(
+                field for field in self.FEED_FIELDS
+                if not field.startswith('author__')
+            ))
+        return self.select_related('author', 'group').only(
+            'author', 'group', *self.FEED_FIELDS
+        )
+
+    def feed_values(self):
+        """Поля карточек словарями, без создания моделей."""
+        return self.values('id', *self.FEED_FIELDS)
+
+
+class Post(RenderedTextMixin, models.Model):
     text = models.TextField(
         verbose_name='Текст',
         help_text='Текст нового поста'
     )
+    text_html = models.TextField(
+        verbose_name='Текст в HTML',
+        blank=True,
+        editable=False
+    )
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата публикации'
@@ -54,9 +126,21 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    thumbnails = models.TextField(
+        verbose_name='Миниатюры',
+        blank=True,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(fields=['-pub_date', '-id']),
+            models.Index(fields=['author', '-pub_date', '-id']),
+            models.Index(fields=['group', '-pub_date', '-id']),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -68,8 +152,33 @@ class Post(models.Model):
             f'{self.group} '
         )
 
+    @cached_property
+    def thumbnail_urls(self):
+        return parse_thumbnails(self.thumbnails)
+
+
+class CommentQuerySet(models.QuerySet):
+    FEED_FIELDS = (
+        'post',
+        'text',
+        'text_html',
+        'created',
+        'author__username',
+        'author__first_name',
+        'author__last_name',
+    )
+
+    def feed(self):
+        """Комментарии для ленты под постом вместе с авторами."""
+        return self.select_related('author').only(
+            'author', *self.FEED_FIELDS
+        )
+
+    def feed_values(self):
+        return self.values('id', *self.FEED_FIELDS)
+
 
-class Comment(models.Model):
+class Comment(RenderedTextMixin, models.Model):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -86,13 +195,23 @@ class Comment(models.Model):
         verbose_name='Комментарий',
         help_text='Текст комментария'
     )
+    text_html = models.TextField(
+        verbose_name='Комментарий в HTML',
+        blank=True,
+        editable=False
+    )
     created = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата комметария'
     )
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         ordering = ('-created',)
+        indexes = [
+            models.Index(fields=['post', '-created', '-id']),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -120,6 +239,9 @@ class Follow(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(fields=['author', 'user']),
+        ]
         constraints = [
             models.UniqueConstraint(
                 name="%(app_label)s_%(class)s_unique_relationships",
@@ -138,3 +260,80 @@ class Follow(models.Model):
             f'Подписчик: {self.user.username},'
             f'автор: {self.author.username}'
         )
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост',
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации'
+    )
+
+    class Meta:
+        ordering = ('-pub_date',)
+        indexes = [
+            models.Index(fields=['user', '-pub_date', '-id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                name="%(app_label)s_%(class)s_unique_entries",
+                fields=['user', 'post'],
+            ),
+        ]
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Записи ленты подписок'
+
+    def __str__(self):
+        return (
+            f'Подписчик: {self.user_id}, '
+            f'пост: {self.post_id}'
+        )
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь',
+    )
+    posts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Постов'
+    )
+    followers = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Подписчиков'
+    )
+    following = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Подписок'
+    )
+    comments = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Комментариев'
+    )
+
+    class Meta:
+        verbose_name = 'Статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+    def __str__(self):
+        return (
+            f'Пользователь: {self.user_id}, '
+            f'постов: {self.posts}, '
+            f'подписчиков: {self.followers}, '
+            f'подписок: {self.following}, '
+            f'комментариев: {self.comments}'
+        )
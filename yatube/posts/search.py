@@ -0,0 +1,126 @@
+from django.db import connection
+from django.db.models import Q
+
+from .models import Post
+
+RANKED_POST_IDS = '''
+    SELECT post_id FROM (
+        SELECT rowid AS post_id, bm25(posts_post_fts) AS score
+        FROM posts_post_fts WHERE posts_post_fts MATCH %s
+        UNION ALL
+        SELECT post_id, bm25(posts_comment_fts) * 0.5
+        FROM posts_comment_fts WHERE posts_comment_fts MATCH %s
+    ) GROUP BY post_id ORDER BY MIN(score), post_id DESC
+    LIMIT %s OFFSET %s
+'''
+COUNT_POST_IDS = '''
+    SELECT COUNT(DISTINCT post_id) FROM (
+        SELECT rowid AS post_id
+        FROM posts_post_fts WHERE posts_post_fts MATCH %s
+        UNION ALL
+        SELECT post_id
+        FROM posts_comment_fts WHERE posts_comment_fts MATCH %s
+    )
+'''
+
+
+def enabled():
+    """Полнотекстовый индекс есть только в SQLite (FTS5)."""
+    return connection.vendor == 'sqlite'
+
+
+def match(query):
+    """Превращает ввод пользователя в безопасный запрос FTS5."""
+    return ' '.join(
+        '"{}"*'.format(term.replace('"', '""')) for term in query.split()
+    )
+
+
+def execute(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def index_post(post):
+    unindex_post(post.pk)
+    execute(
+        'INSERT INTO posts_post_fts (rowid, text) VALUES (%s, %s)',
+        (post.pk, post.text)
+    )
+
+
+def unindex_post(post_id):
+    execute('DELETE FROM posts_post_fts WHERE rowid = %s', (post_id,))
+
+
+def index_comment(comment):
+    unindex_comment(comment.pk)
+    execute(
+        'INSERT INTO posts_comment_fts (rowid, text, post_id) '
+        'VALUES (%s, %s, %s)',
+        (comment.pk, comment.text, comment.post_id)
+    )
+
+
+def unindex_comment(comment_id):
+    execute('DELETE FROM posts_comment_fts WHERE rowid = %s', (comment_id,))
+
+
+def rebuild():
+    """Заново заполняет индекс одним проходом по таблицам."""
+    execute('DELETE FROM posts_post_fts')
+    execute('DELETE FROM posts_comment_fts')
+    execute(
+        'INSERT INTO posts_post_fts (rowid, text) '
+        'SELECT id, text FROM posts_post'
+    )
+    execute(
+        'INSERT INTO posts_comment_fts (rowid, text, post_id) '
+        'SELECT id, text, post_id FROM posts_comment'
+    )
+
+
+def matching_ids(table, query, limit):
+    """Подходящие под запрос строки таблицы по убыванию релевантности."""
+    return [row[0] for row in execute(
+        f'SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s '
+        f'ORDER BY rank LIMIT %s',
+        (match(query), limit)
+    )]
+
+
+class SearchResults:
+    """Ранжированные посты, найденные по тексту поста или комментариев.
+
+    Поддерживает count() и срезы, поэтому подходит для Paginator:
+    и подсчет, и выборка страницы идут по индексу, а не по posts_post.
+    """
+
+    def __init__(self, query):
+        self.query = query
+
+    def fallback(self):
+        return Post.objects.feed().filter(
+            Q(text__icontains=self.query)
+            | Q(comments__text__icontains=self.query)
+        ).distinct()
+
+    def count(self):
+        if not enabled():
+            return self.fallback().count()
+        query = match(self.query)
+        return execute(COUNT_POST_IDS, (query, query))[0][0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not enabled():
+            return self.fallback()[index]
+        query = match(self.query)
+        ids = [row[0] for row in execute(RANKED_POST_IDS, (
+            query, query, index.stop - index.start, index.start
+        ))]
+        posts = Post.objects.feed().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
@@ -0,0 +1,158 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import groups, search, stats, tasks, timeline, versions
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+COUNTERS = {Post: 'posts', Comment: 'comments'}
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    instance.previous_group_id = None
+    if instance.pk and not raw:
+        instance.previous_group_id, image = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', 'image').first() or (None, None)
+        if image != instance.image.name:
+            instance.thumbnails = ''
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and timeline.fan_out(instance):
+        tasks.schedule_timeline_trim(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def bump_post_feeds(sender, instance, raw=False, **kwargs):
+    if not raw:
+        versions.bump(*versions.post_feeds(
+            instance,
+            instance.group_id,
+            getattr(instance, 'previous_group_id', None),
+        ))
+
+
+@receiver(post_delete, sender=Post)
+def bump_deleted_post_feeds(sender, instance, **kwargs):
+    versions.bump(*versions.post_feeds(instance, instance.group_id))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_feeds(sender, instance, raw=False, **kwargs):
+    if not raw:
+        versions.bump(
+            f'post:{instance.post_id}', f'profile:{instance.author_id}'
+        )
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def bump_group_feeds(sender, instance, raw=False, **kwargs):
+    if not raw:
+        versions.bump('groups', f'group:{instance.pk}')
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def trim_timeline(sender, instance, **kwargs):
+    timeline.remove(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def bump_follow_feeds(sender, instance, raw=False, **kwargs):
+    if not raw:
+        versions.bump(
+            f'follow:{instance.user_id}',
+            f'profile:{instance.user_id}',
+            f'profile:{instance.author_id}',
+        )
+
+
+@receiver(post_save, sender=User)
+def bump_author_feeds(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw and getattr(
+        instance, 'summary_changed', False
+    ):
+        versions.bump(
+            'authors', f'author:{instance.pk}', f'profile:{instance.pk}'
+        )
+
+
+@receiver(post_save, sender=User)
+def create_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.change(instance.author_id, COUNTERS[sender], 1)
+
+
+@receiver(post_save, sender=Post)
+def count_group_posts(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_group_id = getattr(instance, 'previous_group_id', None)
+    if created or previous_group_id != instance.group_id:
+        groups.change(previous_group_id, -1)
+        groups.change(instance.group_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_group_post(sender, instance, **kwargs):
+    groups.change(instance.group_id, -1)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def count_deleted(sender, instance, **kwargs):
+    stats.change(instance.author_id, COUNTERS[sender], -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.change(instance.author_id, 'followers', 1)
+        stats.change(instance.user_id, 'following', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_unfollow(sender, instance, **kwargs):
+    stats.change(instance.author_id, 'followers', -1)
+    stats.change(instance.user_id, 'following', -1)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, **kwargs):
+    if search.enabled() and not raw:
+        search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    if search.enabled():
+        search.unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, raw=False, **kwargs):
+    if search.enabled() and not raw:
+        search.index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    if search.enabled():
+        search.unindex_comment(instance.pk)
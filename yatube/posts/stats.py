@@ -0,0 +1,50 @@
+from collections import defaultdict
+
+from django.db.models import Count, F
+
+from .models import Comment, Follow, Post, UserStats
+
+SOURCES = (
+    ('posts', Post, 'author'),
+    ('comments', Comment, 'author'),
+    ('followers', Follow, 'author'),
+    ('following', Follow, 'user'),
+)
+FIELDS = tuple(field for field, model, key in SOURCES)
+
+
+def change(user_id, field, delta):
+    """Атомарно сдвигает счетчик пользователя на delta."""
+    stats = UserStats.objects.filter(user_id=user_id)
+    if delta < 0:
+        stats = stats.filter(**{f'{field}__gte': -delta})
+    if not stats.update(**{field: F(field) + delta}) and delta > 0:
+        recount(user_id)
+
+
+def for_user(user):
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return recount(user.pk)
+
+
+def count(user_ids=None):
+    """Считает значения счетчиков по исходным таблицам."""
+    counts = defaultdict(lambda: dict.fromkeys(FIELDS, 0))
+    for field, model, key in SOURCES:
+        rows = model.objects.order_by().values_list(key).annotate(
+            total=Count('pk')
+        )
+        if user_ids is not None:
+            rows = rows.filter(**{f'{key}__in': user_ids})
+        for user_id, total in rows:
+            counts[user_id][field] = total
+    return counts
+
+
+def recount(user_id):
+    stats, _ = UserStats.objects.update_or_create(
+        user_id=user_id, defaults=count([user_id])[user_id]
+    )
+    return stats
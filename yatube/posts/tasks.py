@@ -0,0 +1,77 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+from sorl.thumbnail import delete
+
+from jobs.queue import enqueue, register
+
+from . import thumbnails, timeline, versions
+from .models import Post
+
+PROCESS_IMAGE = 'posts.process_image'
+TRIM_TIMELINES = 'posts.trim_timelines'
+
+
+def schedule_image_processing(post):
+    if post.image:
+        enqueue(PROCESS_IMAGE, post_id=post.pk)
+
+
+def schedule_timeline_trim(author_id):
+    enqueue(TRIM_TIMELINES, author_id=author_id)
+
+
+@register(TRIM_TIMELINES)
+def trim_timelines(author_id):
+    timeline.trim_followers(author_id)
+
+
+def normalize_image(field_file):
+    """Убирает EXIF и уменьшает картинку до POST_IMAGE_MAX_SIZE.
+
+    Результат пишется рядом новым файлом, исходный не трогается;
+    возвращает имя нового файла или None, если менять нечего.
+    """
+    max_size = settings.POST_IMAGE_MAX_SIZE
+    with field_file.storage.open(field_file.name) as source:
+        image = Image.open(source)
+        if getattr(image, 'is_animated', False):
+            return None
+        image.load()
+        if 'exif' not in image.info and max(image.size) <= max_size:
+            return None
+        image_format = 'JPEG' if image.format == 'MPO' else image.format
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_size, max_size))
+    buffer = BytesIO()
+    image.save(buffer, format=image_format)
+    return field_file.storage.save(
+        field_file.name, ContentFile(buffer.getvalue())
+    )
+
+
+def replace_image(post, name):
+    """Переключает пост на обработанный файл и удаляет прежний.
+
+    Если картинку поста тем временем сменили, обработанный файл удаляется.
+    """
+    if not Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        image=name, thumbnails=''
+    ):
+        post.image.storage.delete(name)
+        return
+    delete(post.image)
+    versions.bump(*versions.post_feeds(post, post.group_id))
+
+
+@register(PROCESS_IMAGE)
+def process_image(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    name = normalize_image(post.image)
+    if name is not None:
+        replace_image(post, name)
+    thumbnails.generate(post.pk)
@@ -0,0 +1,47 @@
+from itertools import chain
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from posts import versions
+
+register = template.Library()
+
+KEY = 'posts:card:{}:{}:{}'
+TEMPLATE = 'includes/post.html'
+
+
+def card_feeds(post):
+    """Версии, от которых зависит карточка: пост, автор и группы."""
+    feeds = [f'post:{post.pk}', f'author:{post.author_id}']
+    if post.group_id:
+        feeds.append('groups')
+    return feeds
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts, hide_author=False, hide_group=False):
+    """HTML карточек постов страницы; готовые берутся одним get_many."""
+    posts = list(posts)
+    feeds = [card_feeds(post) for post in posts]
+    found = iter(versions.get(*chain.from_iterable(feeds)))
+    variant = f'{int(bool(hide_author))}{int(bool(hide_group))}'
+    keys = [
+        KEY.format(variant, post.pk, ':'.join(next(found) for _ in names))
+        for post, names in zip(posts, feeds)
+    ]
+    cards = cache.get_many(keys)
+    missing = {}
+    if len(cards) < len(keys):
+        card = context.template.engine.get_template(TEMPLATE)
+        for post, key in zip(posts, keys):
+            if key not in cards:
+                cards[key] = missing[key] = card.render(context.new({
+                    'post': post,
+                    'hide_author': hide_author,
+                    'hide_group': hide_group,
+                }))
+        cache.set_many(missing, settings.POSTS_CACHE_TIMEOUT)
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,104 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+API_INDEX_URL = reverse('posts:api_index')
+API_FOLLOW_URL = reverse('posts:api_follow_index')
+API_GROUP_URL = reverse('posts:api_group_posts', args=('test-slug',))
+API_PROFILE_URL = reverse('posts:api_profile', args=('author',))
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user('author', first_name='Лев')
+        cls.user = User.objects.create_user('reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание'
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group, text='Пост %s' % i
+            ) for i in range(3)
+        ][::-1]
+        cls.comment = Comment.objects.create(
+            post=cls.posts[0], author=cls.user, text='Комментарий'
+        )
+        cls.user_client = Client()
+        cls.user_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url, client=None, **params):
+        response = (client or self.client).get(url, params)
+        return response, json.loads(b''.join(response.streaming_content))
+
+    def ids(self, data):
+        return [row['id'] for row in data['results']]
+
+    def test_feeds(self):
+        """Ленты отдают посты в порядке публикации с автором и группой."""
+        for url, client in (
+            (API_INDEX_URL, None),
+            (API_GROUP_URL, None),
+            (API_PROFILE_URL, None),
+            (API_FOLLOW_URL, self.user_client),
+        ):
+            with self.subTest(url=url):
+                response, data = self.get(url, client)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertEqual(
+                    self.ids(data), [post.id for post in self.posts]
+                )
+                self.assertEqual(data['results'][0], {
+                    'id': self.posts[0].id,
+                    'text': self.posts[0].text,
+                    'pub_date': data['results'][0]['pub_date'],
+                    'author': {'username': 'author', 'name': 'Лев'},
+                    'group': {'slug': 'test-slug', 'title': 'Тестовая группа'},
+                    'image': None,
+                    'thumbnails': {},
+                })
+
+    def test_cursor_and_limit(self):
+        """Курсор и limit работают так же, как в HTML-лентах."""
+        _, first = self.get(API_INDEX_URL, limit=2)
+        self.assertEqual(self.ids(first), [post.id for post in self.posts[:2]])
+        _, second = self.get(API_INDEX_URL, cursor=first['next_cursor'])
+        self.assertEqual(self.ids(second), [self.posts[2].id])
+        self.assertIsNone(second['next_cursor'])
+        with override_settings(API_MAX_PAGE_SIZE=1):
+            _, capped = self.get(API_INDEX_URL, limit=50)
+        self.assertEqual(len(capped['results']), 1)
+
+    def test_post_detail(self):
+        """Пост отдаётся вместе со страницей комментариев."""
+        url = reverse('posts:api_post_detail', args=(self.posts[0].id,))
+        _, data = self.get(url)
+        self.assertEqual(data['post']['id'], self.posts[0].id)
+        self.assertEqual(data['results'][0]['text'], self.comment.text)
+
+    def test_errors(self):
+        """Ошибки отдаются в JSON: 404 и 401 без входа."""
+        for url, status in (
+            (reverse('posts:api_group_posts', args=('missing',)), 404),
+            (reverse('posts:api_profile', args=('missing',)), 404),
+            (reverse('posts:api_post_detail', args=(0,)), 404),
+            (API_FOLLOW_URL, 401),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('detail', response.json())
+
+    def test_index_costs_one_query(self):
+        """Главная лента в API — один запрос к базе."""
+        with self.assertNumQueries(1):
+            self.get(API_INDEX_URL)
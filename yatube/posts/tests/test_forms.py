@@ -1,11 +1,16 @@
 import shutil
 import tempfile
+from io import BytesIO
 
 from django import forms
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
+
+from jobs.models import Job
+from jobs.queue import run_pending
 
 from ..forms import CommentForm, PostForm
 from ..models import Comment, Group, Post, User
@@ -240,3 +245,57 @@ class PostCreateFormTests(TestCase):
             response.context.get('form').fields.get('text'),
             forms.fields.CharField
         )
+
+    @override_settings(POST_IMAGE_MAX_SIZE=10)
+    def test_gif_is_processed_in_background(self):
+        """Фоновая задача готовит миниатюры и для GIF, в том числе анимации."""
+        buffer = BytesIO()
+        frames = [Image.new('P', (40, 20), color) for color in (1, 2)]
+        frames[0].save(
+            buffer, format='GIF', save_all=True, append_images=frames[1:]
+        )
+        for name, content in (
+            ('small.gif', SMALL_GIF), ('animated.gif', buffer.getvalue())
+        ):
+            with self.subTest(name=name):
+                Post.objects.all().delete()
+                Job.objects.all().delete()
+                self.authorized_client.post(POST_CREATE_URL, data={
+                    'text': 'Пост с анимацией',
+                    'image': SimpleUploadedFile(
+                        name=name, content=content, content_type='image/gif'
+                    ),
+                })
+                self.assertEqual(run_pending(), 1)
+                self.assertEqual(Job.objects.get().status, Job.DONE)
+                post = Post.objects.get()
+                self.assertIn('card', post.thumbnail_urls)
+
+    @override_settings(POST_IMAGE_MAX_SIZE=10)
+    def test_image_is_processed_in_background(self):
+        """Картинка обрабатывается фоновой задачей после публикации."""
+        Post.objects.all().delete()
+        buffer = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        Image.new('RGB', (40, 20)).save(buffer, format='JPEG', exif=exif)
+        self.authorized_client.post(POST_CREATE_URL, data={
+            'text': 'Пост с фотографией',
+            'image': SimpleUploadedFile(
+                name='photo.jpg',
+                content=buffer.getvalue(),
+                content_type='image/jpeg'
+            ),
+        })
+        post = Post.objects.get()
+        self.assertEqual(post.thumbnails, '')
+        self.assertEqual(run_pending(), 1)
+        post.refresh_from_db()
+        self.assertRegex(post.image.name, rf'^{MEDIA_PATH}photo_\w+\.jpg$')
+        self.assertFalse(
+            post.image.storage.exists(MEDIA_PATH + 'photo.jpg')
+        )
+        self.assertIn('card', post.thumbnail_urls)
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (10, 5))
+            self.assertNotIn('exif', image.info)
@@ -0,0 +1,67 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import groups
+from ..models import Group, Post, User
+
+
+class GroupTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user('author')
+
+    def setUp(self):
+        self.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание'
+        )
+        self.another_group = Group.objects.create(
+            title='Другая группа', slug='another-slug', description='Описание'
+        )
+
+    def assert_counts(self, group_count, another_count):
+        self.assertEqual(
+            Group.objects.get(pk=self.group.pk).post_count, group_count
+        )
+        self.assertEqual(
+            Group.objects.get(pk=self.another_group.pk).post_count,
+            another_count
+        )
+
+    def test_post_count_follows_posts(self):
+        """Счетчик постов группы меняется при создании, переносе, удалении."""
+        post = Post.objects.create(
+            author=self.author, group=self.group, text='Пост'
+        )
+        Post.objects.create(author=self.author, group=self.group, text='2')
+        self.assert_counts(2, 0)
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assert_counts(2, 0)
+        post.group = self.another_group
+        post.save()
+        self.assert_counts(1, 1)
+        post.delete()
+        self.assert_counts(1, 0)
+
+    def test_recount_fixes_drift(self):
+        """recount_stats исправляет счетчики групп."""
+        Post.objects.bulk_create(
+            Post(author=self.author, group=self.group, text='Пост %s' % i)
+            for i in range(3)
+        )
+        self.assert_counts(0, 0)
+        call_command('recount_stats', stdout=StringIO())
+        self.assert_counts(3, 0)
+
+    def test_lookup_is_cached_until_group_changes(self):
+        """Группа по slug берется из кэша, пока ее не изменили."""
+        self.assertEqual(groups.get('test-slug'), self.group)
+        with self.assertNumQueries(0):
+            self.assertEqual(groups.get('test-slug'), self.group)
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertEqual(groups.get('test-slug').title, 'Новое название')
+        self.assertIsNone(groups.get('missing-slug'))
@@ -1,6 +1,9 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-from ..models import Group, Post, User
+from ..models import Comment, Group, Post, User
 
 
 class PostModelTest(TestCase):
@@ -61,3 +64,32 @@ class PostModelTest(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     Post._meta.get_field(field).help_text, expected_value)
+
+    def test_text_html_is_rendered_on_save(self):
+        """HTML текста экранируется и сохраняется при записи."""
+        post = Post.objects.create(author=self.user, text='<b>раз</b>\n\nдва')
+        self.assertEqual(
+            post.text_html, '<p>&lt;b&gt;раз&lt;/b&gt;</p>\n\n<p>два</p>'
+        )
+        post.text = 'три'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p>три</p>')
+        comment = Comment.objects.create(
+            post=post, author=self.user, text='a\nb'
+        )
+        self.assertEqual(comment.text_html, '<p>a<br>b</p>')
+
+    def test_render_text_html_command(self):
+        """Команда заполняет пустой HTML, с --all — пересобирает весь."""
+        Post.objects.filter(pk=self.post.pk).update(text_html='')
+        call_command('render_text_html', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text_html, '<p>Тестовый пост</p>')
+        Post.objects.filter(pk=self.post.pk).update(text_html='<p>old</p>')
+        call_command('render_text_html', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text_html, '<p>old</p>')
+        call_command('render_text_html', '--all', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text_html, '<p>Тестовый пост</p>')
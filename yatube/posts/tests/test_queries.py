@@ -0,0 +1,119 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from yatube.settings import POSTS_PER_PAGE
+
+from .. import versions
+from ..models import Comment, Follow, Group, Post, User
+
+AUTHOR = 'author'
+USER = 'StasBasov'
+GROUP_SLUG = 'test-slug'
+INDEX_URL = reverse('posts:index')
+FOLLOW_URL = reverse('posts:follow_index')
+GROUP_POSTS_URL = reverse('posts:group_posts', args=(GROUP_SLUG,))
+PROFILE_URL = reverse('posts:profile', args=(AUTHOR,))
+
+
+class FeedQueriesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            AUTHOR, first_name='Иван', last_name='Иванов'
+        )
+        cls.user = User.objects.create_user(USER)
+        cls.user_client = Client()
+        cls.user_client.force_login(cls.user)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.post = Post.objects.create(
+            author=cls.author,
+            group=cls.group,
+            text='Тестовый пост',
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.user, text='Комментарий'
+        )
+        cls.POST_DETAIL_URL = reverse(
+            'posts:post_detail', args=(cls.post.id,)
+        )
+        cls.COMMENTS_URL = reverse(
+            'posts:post_comments', args=(cls.post.id,)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def query_budgets(self):
+        """Сессия и пользователь, ключ для ETag, выборки страницы, шапка."""
+        return (
+            (INDEX_URL, 3),
+            (FOLLOW_URL, 4),
+            (GROUP_POSTS_URL, 4),
+            (PROFILE_URL, 6),
+            (self.POST_DETAIL_URL, 5),
+            (self.COMMENTS_URL, 1),
+        )
+
+    def assert_budgets(self):
+        for url, budget in self.query_budgets():
+            with self.subTest(url=url):
+                cache.clear()
+                with self.assertNumQueries(budget):
+                    self.user_client.get(url)
+
+    def test_feeds_query_budget(self):
+        """Число запросов лент не зависит от числа постов на странице."""
+        self.assert_budgets()
+        for i in range(POSTS_PER_PAGE):
+            Post.objects.create(
+                author=self.author,
+                group=self.group,
+                text='Тестовый пост %s' % i,
+            )
+            Comment.objects.create(
+                post=self.post,
+                author=User.objects.create_user(f'commentator{i}'),
+                text='Комментарий %s' % i,
+            )
+        self.assert_budgets()
+
+    def test_post_create_does_not_depend_on_followers(self):
+        """Публикация поста не делает работы на каждого подписчика."""
+        counts = []
+        for i in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                post = Post.objects.create(author=self.author, text='Пост')
+            counts.append((len(queries), len(versions.post_feeds(post))))
+            for j in range(5):
+                Follow.objects.create(
+                    user=User.objects.create_user(f'follower{i}{j}'),
+                    author=self.author,
+                )
+        self.assertEqual(counts[0], counts[1])
+
+    @skipUnless(connection.vendor == 'sqlite', 'Планы запросов SQLite')
+    def test_feeds_are_read_by_index(self):
+        """Ленты читаются по индексам, без сортировки во временном дереве."""
+        out = StringIO()
+        call_command(
+            'explain_feeds', group=GROUP_SLUG, author=AUTHOR, user=USER,
+            post=self.post.id, stdout=out,
+        )
+        plans = out.getvalue()
+        self.assertNotIn('TEMP B-TREE', plans)
+        self.assertNotIn('SCAN posts_post\n', plans)
+        self.assertIn('posts_post_author__', plans)
+        self.assertIn('posts_post_group_i', plans)
@@ -9,14 +9,21 @@ POST_ID = 1
 CASES = (
     ('/', 'index', None),
     ('/create/', 'post_create', None),
+    ('/search/', 'post_search', None),
     ('/follow/', 'follow_index', None),
     (f'/posts/{POST_ID}/', 'post_detail', (POST_ID,)),
     (f'/profile/{USERNAME}/', 'profile', (USERNAME,)),
     (f'/posts/{POST_ID}/edit/', 'post_edit', (POST_ID,)),
     (f'/group/{GROUP_SLUG}/', 'group_posts', (GROUP_SLUG,)),
     (f'/posts/{POST_ID}/comment/', 'add_comment', (POST_ID,)),
+    (f'/posts/{POST_ID}/comments/', 'post_comments', (POST_ID,)),
     (f'/profile/{USERNAME}/follow/', 'profile_follow', (USERNAME,)),
     (f'/profile/{USERNAME}/unfollow/', 'profile_unfollow', (USERNAME,)),
+    ('/api/posts/', 'api_index', None),
+    ('/api/follow/', 'api_follow_index', None),
+    (f'/api/posts/{POST_ID}/', 'api_post_detail', (POST_ID,)),
+    (f'/api/profile/{USERNAME}/', 'api_profile', (USERNAME,)),
+    (f'/api/group/{GROUP_SLUG}/', 'api_group_posts', (GROUP_SLUG,)),
 )
 
 
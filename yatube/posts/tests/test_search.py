@@ -0,0 +1,71 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import search
+from ..models import Comment, Post, User
+
+SEARCH_URL = reverse('posts:post_search')
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.guest = Client()
+        cls.author = User.objects.create_user('author')
+        cls.post = Post.objects.create(
+            author=cls.author, text='Яблоки созрели в саду'
+        )
+        cls.commented = Post.objects.create(
+            author=cls.author, text='Обычный пост'
+        )
+        Comment.objects.create(
+            post=cls.commented, author=cls.author, text='Вкусные яблоки'
+        )
+        cls.other = Post.objects.create(
+            author=cls.author, text='Груши тоже созрели'
+        )
+
+    def search(self, query, **params):
+        return self.guest.get(SEARCH_URL, {'q': query, **params})
+
+    def test_search_finds_posts_and_comments(self):
+        """Поиск находит посты по тексту поста и комментариев."""
+        page = self.search('ЯБЛОКИ').context['page_obj']
+        self.assertEqual(list(page), [self.post, self.commented])
+        self.assertEqual(page.paginator.count, 2)
+        self.assertEqual(
+            list(self.search('созрели сад').context['page_obj']),
+            [self.post]
+        )
+
+    def test_search_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении постов."""
+        self.other.text = 'Теперь здесь яблоки'
+        self.other.save()
+        self.assertIn(self.other, self.search('яблоки').context['page_obj'])
+        self.other.delete()
+        self.assertNotIn(
+            self.other, self.search('яблоки').context['page_obj']
+        )
+
+    def test_rebuild_search_index(self):
+        """Индекс восстанавливается после изменений в обход сигналов."""
+        Post.objects.filter(pk=self.other.pk).update(text='Спелые яблоки')
+        self.assertEqual(len(search.SearchResults('спелые')), 0)
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(search.SearchResults('спелые')), 1)
+
+    @override_settings(POSTS_PER_PAGE=1)
+    def test_search_is_paginated(self):
+        """Результаты поиска разбиты на страницы."""
+        response = self.search('яблоки', page=2)
+        self.assertEqual(list(response.context['page_obj']), [self.commented])
+        self.assertContains(response, 'q=%D1%8F%D0%B1')
+
+    def test_empty_query(self):
+        """Пустой запрос показывает только форму поиска."""
+        self.assertIsNone(self.search(' ').context['page_obj'])
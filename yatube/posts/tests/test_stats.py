@@ -0,0 +1,41 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Comment, Follow, Post, User, UserStats
+
+
+class UserStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user('author')
+        cls.user = User.objects.create_user('StasBasov')
+
+    def assert_stats(self, user, **expected):
+        stats = UserStats.objects.get(user=user)
+        for field, value in expected.items():
+            with self.subTest(user=user, field=field):
+                self.assertEqual(getattr(stats, field), value)
+
+    def test_counters_follow_changes(self):
+        """Счетчики меняются вместе с постами, комментариями и подписками."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        Comment.objects.create(post=post, author=self.user, text='Ответ')
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        self.assert_stats(self.author, posts=1, followers=1, comments=0)
+        self.assert_stats(self.user, posts=0, following=1, comments=1)
+        follow.delete()
+        post.delete()
+        self.assert_stats(self.author, posts=0, followers=0)
+        self.assert_stats(self.user, following=0, comments=0)
+
+    def test_recount_stats_repairs_drift(self):
+        """recount_stats восстанавливает разошедшиеся счетчики."""
+        Post.objects.create(author=self.author, text='Пост')
+        UserStats.objects.filter(user=self.author).update(posts=10)
+        UserStats.objects.filter(user=self.user).delete()
+        call_command('recount_stats', stdout=StringIO())
+        self.assert_stats(self.author, posts=1)
+        self.assert_stats(self.user, posts=0, following=0)
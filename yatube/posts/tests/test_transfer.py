@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import search
+from ..models import Comment, Follow, Group, Post, TimelineEntry, User
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        cls.path = os.path.join(cls.directory, 'dump.ndjson')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        author = User.objects.create_user('author')
+        reader = User.objects.create_user('reader')
+        group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание'
+        )
+        Follow.objects.create(user=reader, author=author)
+        self.posts = [
+            Post.objects.create(
+                author=author, group=group, text='Уникальный пост %s' % i
+            ) for i in range(5)
+        ]
+        Comment.objects.create(
+            post=self.posts[0], author=reader, text='Комментарий'
+        )
+        call_command(
+            'export_yatube', output=self.path, chunk_size=2, stderr=StringIO()
+        )
+        self.dates = dict(Post.objects.values_list('pk', 'pub_date'))
+        for model in (Follow, Comment, Post, Group, User):
+            model.objects.all().delete()
+
+    def load(self, **options):
+        call_command(
+            'import_yatube', self.path, batch_size=2, stdout=StringIO(),
+            **options
+        )
+
+    def assert_restored(self):
+        self.assertEqual(
+            dict(Post.objects.values_list('pk', 'pub_date')), self.dates
+        )
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+        reader = User.objects.get(username='reader')
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=reader).count(), 5
+        )
+        self.assertEqual(User.objects.get(username='author').stats.posts, 5)
+        if search.enabled():
+            self.assertEqual(len(search.SearchResults('Уникальный')), 5)
+
+    def test_export_and_import(self):
+        """Выгрузка загружается обратно с датами, лентами и счетчиками."""
+        self.load()
+        self.assert_restored()
+        self.assertFalse(os.path.exists(self.path + '.checkpoint'))
+
+    def test_import_resumes_from_checkpoint(self):
+        """Прерванная загрузка продолжается с контрольной точки без дублей."""
+        self.load()
+        for model in (Follow, Comment, Post):
+            model.objects.all().delete()
+        with open(self.path + '.checkpoint', 'w') as stream:
+            stream.write('2')
+        self.load()
+        self.assert_restored()
+        self.assertEqual(Group.objects.count(), 1)
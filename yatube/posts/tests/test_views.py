@@ -1,15 +1,24 @@
+import base64
+import json
 import shutil
 import tempfile
+from io import BytesIO, StringIO
 
 from django.conf import settings
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image, features
 
+from core import paginator
+from core.paginator import CursorPaginator
+from jobs.queue import run_pending
 from yatube.settings import POSTS_PER_PAGE
 
-from ..models import Follow, Group, Post, User
+from .. import thumbnails, versions
+from ..models import Comment, Follow, Group, Post, TimelineEntry, User
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 AUTHOR = 'author'
@@ -131,7 +140,10 @@ class PostPagesTests(TestCase):
     def test_index_page_cache(self):
         '''Содержимое страницы index кэшируется'''
         response = self.guest.get(INDEX_URL)
-        Post.objects.all().delete()
+        Post.objects.update(
+            text='Текст, измененный в обход сигналов',
+            text_html='<p>Текст, измененный в обход сигналов</p>',
+        )
         self.assertEqual(
             self.guest.get(INDEX_URL).content,
             response.content
@@ -142,6 +154,42 @@ class PostPagesTests(TestCase):
             response.content
         )
 
+    def test_feed_cache_is_invalidated_by_changes(self):
+        '''Изменения постов сбрасывают кэш лент'''
+        urls = (INDEX_URL, FOLLOW_URL, GROUP_POSTS_URL, PROFILE_URL)
+        responses = {url: self.user_client.get(url) for url in urls}
+        post = Post.objects.get(id=self.post.id)
+        post.text = 'Отредактированный текст поста'
+        post.save()
+        for url in urls:
+            with self.subTest(url=url):
+                content = self.user_client.get(url).content.decode()
+                self.assertNotEqual(content, responses[url].content)
+                self.assertIn(post.text, content)
+
+    def test_feeds_do_not_share_fragments_after_bump(self):
+        '''Ленты с общей версией после bump кэшируются раздельно'''
+        other = User.objects.create_user('other')
+        Post.objects.create(author=other, text='Пост другого автора')
+        Post.objects.create(author=self.author, text='Новый пост автора')
+        self.assertContains(self.guest.get(INDEX_URL), 'Пост другого автора')
+        for url in (PROFILE_URL, FOLLOW_URL):
+            with self.subTest(url=url):
+                self.assertNotContains(
+                    self.user_client.get(url), 'Пост другого автора'
+                )
+
+    def test_feed_cache_depends_on_page(self):
+        '''Страницы ленты кэшируются раздельно'''
+        Post.objects.bulk_create(
+            Post(author=self.author, text='Тестовый пост %s' % i)
+            for i in range(POSTS_PER_PAGE)
+        )
+        self.assertNotEqual(
+            self.guest.get(INDEX_URL + '?page=1').content,
+            self.guest.get(INDEX_URL + '?page=2').content
+        )
+
     def test_authorized_user_can_subscribe(self):
         '''Авторизованный пользователь может подписаться'''
         Follow.objects.all().delete()
@@ -174,6 +222,7 @@ class PostPagesTests(TestCase):
                 text='Тестовый пост %s' % i
             ) for i in range(batch_size)
         )
+        call_command('rebuild_timelines', stdout=StringIO())
         pages = (
             (INDEX_URL + '?page=1', POSTS_PER_PAGE),
             (FOLLOW_URL + '?page=1', POSTS_PER_PAGE),
@@ -190,3 +239,269 @@ class PostPagesTests(TestCase):
                 self.assertEqual(
                     len(response.context['page_obj']), posts
                 )
+
+    def test_cursor_pagination(self):
+        '''Курсорная пагинация проходит ленту без пропусков и повторов'''
+        Post.objects.all().delete()
+        Post.objects.bulk_create(
+            Post(
+                group=self.group,
+                author=self.author,
+                text='Тестовый пост %s' % i
+            ) for i in range(2 * POSTS_PER_PAGE + 1)
+        )
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        )
+        seen = []
+        pages = []
+        page = self.guest.get(INDEX_URL).context['page_obj']
+        while True:
+            pages.append(page)
+            seen += [post.pk for post in page]
+            if not page.has_next():
+                break
+            page = self.guest.get(
+                INDEX_URL, {'cursor': page.next_cursor}
+            ).context['page_obj']
+        self.assertEqual(seen, expected)
+        self.assertEqual([page.number for page in pages], [1, 2, 3])
+        previous = self.guest.get(
+            INDEX_URL, {'cursor': pages[-1].previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(previous.number, 2)
+        self.assertEqual(list(previous), list(pages[1]))
+        self.assertEqual(
+            list(self.guest.get(
+                INDEX_URL, {'cursor': 'garbage'}
+            ).context['page_obj']),
+            list(pages[0])
+        )
+
+    def test_forged_cursor_is_ignored(self):
+        '''Курсор без подписи не задает номер страницы и навигацию'''
+        Post.objects.bulk_create(
+            Post(author=self.author, text='Тестовый пост %s' % i)
+            for i in range(2 * POSTS_PER_PAGE)
+        )
+        post = Post.objects.order_by('-pub_date', '-pk')[POSTS_PER_PAGE]
+        data = json.dumps([post.pub_date.isoformat(), post.pk, 10 ** 6, 0])
+        forged = base64.urlsafe_b64encode(data.encode()).decode()
+        response = self.guest.get(INDEX_URL, {'cursor': forged})
+        page = response.context['page_obj']
+        self.assertEqual(page.number, 1)
+        self.assertLess(len(response.content), 100000)
+
+    def test_paginator_shows_window_of_pages(self):
+        '''Ссылки ведут лишь на соседние страницы, а не на все'''
+        Post.objects.bulk_create(
+            Post(author=self.author, text='Тестовый пост %s' % i)
+            for i in range(10)
+        )
+        page = CursorPaginator(
+            Post.objects.all(), 1, count=10 ** 6
+        ).get_page(5)
+        self.assertEqual(
+            list(paginator.page_window(page)), list(range(1, 10))
+        )
+
+    def test_timeline_follows_subscriptions(self):
+        '''Лента подписок пополняется при публикации и подписке'''
+        timeline = TimelineEntry.objects.filter(user=self.user)
+        self.assertEqual(
+            list(timeline.values_list('post', flat=True)), [self.post.id]
+        )
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(
+            list(timeline.values_list('post', flat=True)),
+            [post.id, self.post.id]
+        )
+        self.user_client.get(PROFILE_UNFOLLOW)
+        self.assertFalse(timeline.exists())
+        with override_settings(TIMELINE_LENGTH=1):
+            self.user_client.get(PROFILE_FOLLOW)
+        self.assertEqual(
+            list(timeline.values_list('post', flat=True)), [post.id]
+        )
+        self.assertEqual(
+            list(self.user_client.get(FOLLOW_URL).context['page_obj']),
+            [post]
+        )
+        with override_settings(TIMELINE_LENGTH=1):
+            newest = Post.objects.create(author=self.author, text='Еще')
+            self.assertEqual(timeline.count(), 2)
+            run_pending()
+        self.assertEqual(
+            list(timeline.values_list('post', flat=True)), [newest.id]
+        )
+
+    def test_feeds_use_stored_thumbnails(self):
+        '''Карточки постов используют заранее подготовленные миниатюры'''
+        thumbnails.generate(self.post.id)
+        post = Post.objects.get(id=self.post.id)
+        url = post.thumbnail_urls['card']
+        for page in (INDEX_URL, GROUP_POSTS_URL, self.POST_DETAIL_URL):
+            with self.subTest(page=page):
+                self.assertContains(self.guest.get(page), f'src="{url}"')
+        post.image = SimpleUploadedFile(
+            name='other.gif', content=SMALL_GIF, content_type='image/gif'
+        )
+        post.save()
+        self.assertEqual(Post.objects.get(id=post.id).thumbnails, '')
+
+    def test_cards_offer_responsive_variants(self):
+        '''Карточка предлагает варианты картинки разной ширины в srcset'''
+        buffer = BytesIO()
+        Image.new('RGB', (700, 300), 'red').save(buffer, format='PNG')
+        post = Post.objects.create(
+            author=self.user,
+            text='Широкая картинка',
+            image=SimpleUploadedFile(
+                name='wide.png', content=buffer.getvalue(),
+                content_type='image/png'
+            ),
+        )
+        thumbnails.generate(post.id)
+        srcset = Post.objects.get(id=post.id).thumbnail_urls['srcset']
+        self.assertEqual(
+            set(srcset), {'webp', 'jpeg'} if features.check('webp')
+            else {'jpeg'}
+        )
+        for image_format, urls in srcset.items():
+            with self.subTest(image_format=image_format):
+                self.assertRegex(urls, r'^\S+ 320w, \S+ 640w$')
+        self.assertContains(
+            self.guest.get(INDEX_URL), f'srcset="{srcset["jpeg"]}"'
+        )
+
+    @override_settings(COMMENTS_PER_PAGE=2)
+    def test_comments_are_paginated(self):
+        '''Комментарии выводятся страницами, ранние — отдельным запросом'''
+        comments = [
+            Comment.objects.create(
+                post=self.post, author=self.user, text='Комментарий %s' % i
+            ) for i in range(3)
+        ]
+        page = self.guest.get(self.POST_DETAIL_URL).context['comments']
+        self.assertEqual(list(page), comments[:0:-1])
+        url = reverse('posts:post_comments', args=(self.post.id,))
+        response = self.guest.get(url, {'cursor': page.next_cursor})
+        self.assertEqual(list(response.context['comments']), comments[:1])
+        self.assertContains(response, comments[0].text)
+        data = self.guest.get(
+            url, {'cursor': page.next_cursor, 'format': 'json'}
+        ).json()
+        self.assertEqual(
+            [comment['id'] for comment in data['comments']],
+            [comments[0].id]
+        )
+        self.assertIsNone(data['next_cursor'])
+        missing = reverse('posts:post_comments', args=(self.post.id + 100,))
+        for params in ({}, {'format': 'json'}):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.guest.get(missing, params).status_code, 404
+                )
+        Comment.objects.all().delete()
+        self.assertEqual(self.guest.get(url).status_code, 200)
+
+    def test_unchanged_pages_are_not_modified(self):
+        '''Неизменившиеся страницы отдают 304 по ETag и Last-Modified'''
+        urls = (
+            INDEX_URL, FOLLOW_URL, GROUP_POSTS_URL, PROFILE_URL,
+            self.POST_DETAIL_URL,
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.user_client.get(url)
+                self.assertEqual(
+                    self.user_client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    ).status_code,
+                    304
+                )
+                self.assertEqual(
+                    self.user_client.get(
+                        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                    ).status_code,
+                    304
+                )
+
+    def test_changes_and_viewer_change_etag(self):
+        '''ETag меняется вместе с лентой и пользователем'''
+        urls = (
+            INDEX_URL, FOLLOW_URL, GROUP_POSTS_URL, PROFILE_URL,
+            self.POST_DETAIL_URL,
+        )
+        etags = {url: self.user_client.get(url)['ETag'] for url in urls}
+        self.assertNotEqual(
+            self.author_client.get(INDEX_URL)['ETag'], etags[INDEX_URL]
+        )
+        Comment.objects.create(post=self.post, author=self.author, text='1')
+        post = Post.objects.get(id=self.post.id)
+        post.text = 'Отредактированный текст поста'
+        post.save()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.user_client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etags[url])
+        reader = User.objects.create_user(username='reader')
+        reader_profile = reverse('posts:profile', args=(reader.username,))
+        etag = self.guest.get(reader_profile)['ETag']
+        Follow.objects.create(user=reader, author=self.author)
+        self.assertContains(
+            self.guest.get(reader_profile, HTTP_IF_NONE_MATCH=etag),
+            'Подписок: 1'
+        )
+
+    def test_post_cards_are_cached(self):
+        '''Карточки постов кэшируются и сбрасываются правкой поста и автора'''
+        self.guest.get(INDEX_URL)
+        Post.objects.filter(id=self.post.id).update(text='Текст в обход')
+        Post.objects.create(author=self.user, text='Новый пост')
+        content = self.guest.get(INDEX_URL).content.decode()
+        self.assertIn('Новый пост', content)
+        self.assertIn(self.post.text, content)
+        post = Post.objects.get(id=self.post.id)
+        post.save()
+        self.assertIn(
+            'Текст в обход', self.guest.get(INDEX_URL).content.decode()
+        )
+        self.author.first_name = 'Переименованный'
+        self.author.save()
+        self.assertIn(
+            'Переименованный', self.guest.get(INDEX_URL).content.decode()
+        )
+
+    def test_rename_refreshes_feeds_and_etags(self):
+        '''Смена имени автора или комментатора обновляет страницы и ETag'''
+        Comment.objects.create(post=self.post, author=self.user, text='1')
+        urls = (INDEX_URL, GROUP_POSTS_URL, FOLLOW_URL, self.POST_DETAIL_URL)
+        etags = {url: self.user_client.get(url)['ETag'] for url in urls}
+        self.user.first_name = 'Новое имя комментатора'
+        self.user.save()
+        self.assertContains(
+            self.user_client.get(
+                self.POST_DETAIL_URL,
+                HTTP_IF_NONE_MATCH=etags[self.POST_DETAIL_URL]
+            ),
+            'Новое имя комментатора'
+        )
+        self.author.refresh_from_db()
+        authors = versions.get('authors')
+        self.author.set_password('new-password')
+        self.author.save()
+        self.assertEqual(versions.get('authors'), authors)
+        self.author.first_name = 'Новое имя автора'
+        self.author.save()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.user_client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertContains(response, 'Новое имя автора')
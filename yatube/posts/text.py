@@ -0,0 +1,33 @@
+"""Готовый HTML текста постов и комментариев.
+
+Фильтр linebreaks с экранированием применяется один раз при записи,
+шаблоны выводят сохраненный результат.
+"""
+from django.db import transaction
+from django.utils.html import linebreaks
+
+
+def render(text):
+    """То же, что {{ text|linebreaks }} в шаблоне с автоэкранированием."""
+    return linebreaks(text, autoescape=True)
+
+
+def backfill(model, batch_size=1000, everything=False):
+    """Заполняет text_html пачками по pk; возвращает число строк.
+
+    Без everything обновляются только строки с пустым text_html.
+    """
+    queryset = model._default_manager.order_by('pk').only('text', 'text_html')
+    if not everything:
+        queryset = queryset.filter(text_html='')
+    updated, last = 0, 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last)[:batch_size])
+        if not chunk:
+            return updated
+        for instance in chunk:
+            instance.text_html = render(instance.text)
+        with transaction.atomic(using=queryset.db):
+            model._default_manager.bulk_update(chunk, ['text_html'])
+        updated += len(chunk)
+        last = chunk[-1].pk
@@ -0,0 +1,64 @@
+import json
+
+from django.conf import settings
+from PIL import features
+from sorl.thumbnail import get_thumbnail
+from sorl.thumbnail.parsers import parse_geometry
+
+from . import versions
+from .models import Post
+
+
+def image_formats():
+    """Форматы вариантов; WebP — только если Pillow собран с ним."""
+    return [
+        image_format for image_format in settings.POST_IMAGE_FORMATS
+        if image_format != 'WEBP' or features.check('webp')
+    ]
+
+
+def widths(image_width):
+    """Ширины вариантов не больше исходной картинки, хотя бы одна."""
+    fitting = [
+        width for width in settings.POST_IMAGE_WIDTHS if width <= image_width
+    ]
+    return fitting or [min(settings.POST_IMAGE_WIDTHS)]
+
+
+def srcset(image, geometry, options):
+    """Строки srcset по форматам: варианты с пропорциями geometry."""
+    width, height = parse_geometry(geometry)
+    return {
+        image_format.lower(): ', '.join(
+            '{} {}w'.format(get_thumbnail(
+                image, f'{variant}x{round(variant * height / width)}',
+                format=image_format, **options
+            ).url, variant)
+            for variant in widths(image.width)
+        )
+        for image_format in image_formats()
+    }
+
+
+def generate(post_id):
+    """Готовит миниатюры поста и сохраняет их адреса в строке поста.
+
+    Для карточки дополнительно сохраняются srcset вариантов разной
+    ширины в WebP и JPEG.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    try:
+        urls = {
+            name: get_thumbnail(post.image, geometry, **options).url
+            for name, (geometry, options) in settings.POST_THUMBNAILS.items()
+        }
+        geometry, options = settings.POST_THUMBNAILS['card']
+        urls['srcset'] = srcset(post.image, geometry, options)
+    except OSError:
+        return
+    if Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        thumbnails=json.dumps(urls)
+    ):
+        versions.bump(*versions.post_feeds(post, post.group_id))
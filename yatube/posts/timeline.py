@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Follow, Post, PostQuerySet, TimelineEntry
+
+
+def entries(user):
+    """Записи ленты подписчика вместе с полями для карточек постов."""
+    return TimelineEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group'
+    ).only(
+        'pub_date',
+        'post__author',
+        'post__group',
+        *(f'post__{field}' for field in PostQuerySet.FEED_FIELDS),
+    )
+
+
+def followers(author_id):
+    return Follow.objects.filter(author_id=author_id).values_list(
+        'user_id', flat=True
+    )
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора.
+
+    Число запросов не зависит от числа подписчиков; ленты обрезает
+    фоновая задача (trim_followers), возвращается число подписчиков.
+    """
+    entries = [
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers(post.author_id)
+    ]
+    TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+    return len(entries)
+
+
+def trim_followers(author_id):
+    """Обрезает ленты всех подписчиков автора."""
+    for user_id in followers(author_id).iterator():
+        trim(user_id)
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту подписчика последние посты нового автора."""
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date'
+    ).values_list('pk', 'pub_date')[:settings.TIMELINE_LENGTH]
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts
+        ),
+        ignore_conflicts=True,
+    )
+    trim(user_id)
+
+
+def remove(user_id, author_id):
+    """Убирает из ленты подписчика посты автора, от которого он отписался."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def trim(user_id):
+    """Обрезает ленту до settings.TIMELINE_LENGTH последних записей."""
+    cutoff = TimelineEntry.objects.filter(user_id=user_id).order_by(
+        '-pub_date', '-pk'
+    ).values_list('pub_date', 'pk')[
+        settings.TIMELINE_LENGTH:settings.TIMELINE_LENGTH + 1
+    ]
+    for pub_date, pk in cutoff:
+        TimelineEntry.objects.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lte=pk),
+            user_id=user_id,
+        ).delete()
+
+
+def rebuild(user_id):
+    """Пересобирает ленту подписчика с нуля."""
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    posts = Post.objects.filter(author__following__user_id=user_id).order_by(
+        '-pub_date'
+    ).values_list('pk', 'pub_date')[:settings.TIMELINE_LENGTH]
+    TimelineEntry.objects.bulk_create(
+        TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts
+    )
@@ -0,0 +1,100 @@
+"""Потоковый перенос данных в формате NDJSON: одна строка — одна запись.
+
+Переносятся только исходные данные; ленты подписок, счетчики и
+поисковый индекс после загрузки пересобираются командами. Готовый HTML
+текста из выгрузки не берется на веру и строится заново при чтении.
+"""
+import datetime
+import json
+from contextlib import contextmanager
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Follow, Group, Post, User
+
+MODELS = (User, Group, Post, Comment, Follow)
+LABELS = {model._meta.label_lower: model for model in MODELS}
+
+
+class Encoder(DjangoJSONEncoder):
+    """Даты с микросекундами: DjangoJSONEncoder обрезает их до миллисекунд."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def columns(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def rows(model, chunk_size):
+    """Строки таблицы по возрастанию pk, порциями без OFFSET."""
+    queryset = model._default_manager.order_by('pk').values(*columns(model))
+    last = None
+    while True:
+        chunk = list((
+            queryset if last is None else queryset.filter(pk__gt=last)
+        )[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last = chunk[-1][model._meta.pk.attname]
+
+
+def dump(stream, chunk_size=2000):
+    """Пишет все модели в stream; возвращает число записей."""
+    written = 0
+    for model in MODELS:
+        label = model._meta.label_lower
+        for row in rows(model, chunk_size):
+            stream.write(json.dumps(
+                {'model': label, 'fields': row},
+                cls=Encoder,
+                ensure_ascii=False,
+            ) + '\n')
+            written += 1
+    return written
+
+
+def batches(lines, batch_size, start=0):
+    """Пачки объектов одной модели: (номер последней строки, модель, объекты).
+
+    Строки с номерами до start включительно пропускаются.
+    """
+    model, objects, number = None, [], start
+    for number, line in enumerate(lines, 1):
+        if number <= start or not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            current = LABELS[record['model']]
+            instance = current(**record['fields'])
+            if hasattr(instance, 'render_html'):
+                instance.render_html()
+        except (ValueError, KeyError, TypeError) as error:
+            raise ValueError(f'Строка {number}: {error!r}')
+        if objects and (current is not model or len(objects) >= batch_size):
+            yield number - 1, model, objects
+            objects = []
+        model = current
+        objects.append(instance)
+    if objects:
+        yield number, model, objects
+
+
+@contextmanager
+def keep_dates():
+    """Не даёт auto_now_add затереть даты из выгрузки при bulk_create."""
+    fields = [
+        field for model in MODELS for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
@@ -1,15 +1,21 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
     path('create/', views.post_create, name='post_create'),
+    path('search/', views.post_search, name='post_search'),
     path(
         'posts/<int:post_id>/comment/', views.add_comment, name='add_comment'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('profile/<str:username>/', views.profile, name='profile'),
@@ -25,4 +31,11 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('api/posts/', api.index, name='api_index'),
+    path(
+        'api/posts/<int:post_id>/', api.post_detail, name='api_post_detail'
+    ),
+    path('api/group/<slug:slug>/', api.group_posts, name='api_group_posts'),
+    path('api/profile/<str:username>/', api.profile, name='api_profile'),
+    path('api/follow/', api.follow_index, name='api_follow_index'),
 ]
@@ -0,0 +1,71 @@
+import time
+
+from django.core.cache import cache
+
+from .models import Follow
+
+KEY = 'posts:version:{}'
+
+
+def new_version():
+    return format(time.time_ns(), 'x')
+
+
+def get(*names):
+    """Возвращает текущие версии лент, заводя недостающие."""
+    keys = [KEY.format(name) for name in names]
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump(*names):
+    """Сбрасывает закэшированные фрагменты, меняя версии лент."""
+    version = new_version()
+    cache.set_many(
+        {KEY.format(name): version for name in names}, timeout=None
+    )
+
+
+def feed_key(request, *names):
+    """Ключ фрагмента ленты: имена и версии лент плюс позиция в ленте.
+
+    Имена обязательны: bump() дает всем затронутым лентам одну и ту же
+    версию, и без них фрагменты разных лент совпали бы.
+    """
+    return ':'.join((
+        *(
+            f'{name}={version}'
+            for name, version in zip(names, get(*names))
+        ),
+        request.GET.get('page') or '',
+        request.GET.get('cursor') or '',
+    ))
+
+
+def post_feeds(post, *group_ids):
+    """Ленты, в которых показывается пост."""
+    return (
+        'index',
+        f'post:{post.pk}',
+        f'profile:{post.author_id}',
+        *(f'group:{group_id}' for group_id in group_ids if group_id),
+    )
+
+
+def follow_feeds(user_id):
+    """Ленты, из которых собрана лента подписок пользователя.
+
+    Пост меняет версию профиля автора, поэтому лента подписок зависит
+    от профилей авторов, и публикации не пишут ничего на подписчика.
+    """
+    authors = Follow.objects.filter(user_id=user_id).values_list(
+        'author_id', flat=True
+    )
+    return (
+        f'follow:{user_id}',
+        *(f'profile:{author_id}' for author_id in authors),
+    )
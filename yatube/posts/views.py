@@ -1,41 +1,72 @@
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.http import urlencode
 
+from core.paginator import CursorPaginator
+from users import lookup
+
+from . import (
+    conditional, groups, search, stats, tasks, timeline, versions,
+)
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import Comment, Follow, Post
+
+
+def page_obj(posts, request, count=None):
+    return CursorPaginator(
+        posts, settings.POSTS_PER_PAGE, count=count
+    ).get_page(request.GET.get('page'), request.GET.get('cursor'))
 
 
-def page_obj(posts, request):
-    return Paginator(
-        posts, settings.POSTS_PER_PAGE
-    ).get_page(request.GET.get('page'))
+def feed_cache(request, *feeds):
+    return {
+        'feed_key': versions.feed_key(
+            request, 'groups', 'authors', *feeds
+        ),
+        'feed_timeout': settings.POSTS_CACHE_TIMEOUT,
+    }
 
 
+@conditional.index
 def index(request):
-    return render(
-        request,
-        'posts/index.html',
-        {'page_obj': page_obj(Post.objects.all(), request)}
-    )
+    return render(request, 'posts/index.html', {
+        'page_obj': page_obj(Post.objects.feed(), request),
+        **feed_cache(request, 'index'),
+    })
 
 
+@conditional.group_posts
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = groups.get_or_404(slug)
     return render(request, 'posts/group_list.html', {
         'group': group,
-        'page_obj': page_obj(group.posts.all(), request),
+        'page_obj': page_obj(
+            group.posts.feed(), request, count=group.post_count
+        ),
+        **feed_cache(request, f'group:{group.pk}'),
     })
 
 
+@conditional.profile
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = lookup.get_or_404(username)
+    author_stats = stats.for_user(author)
+    page = page_obj(
+        author.posts.feed(with_author=False), request,
+        count=author_stats.posts,
+    )
+    for post in page:
+        post.author = author
     return render(
         request,
         'posts/profile.html', {
             'author': author,
-            'page_obj': page_obj(author.posts.all(), request),
+            'stats': author_stats,
+            'page_obj': page,
+            **feed_cache(request, f'profile:{author.pk}'),
             'following': (
                 request.user.is_authenticated
                 and request.user != author
@@ -47,17 +78,68 @@ def profile(request, username):
     )
 
 
+def post_search(request):
+    query = request.GET.get('q', '').strip()
+    return render(request, 'posts/search.html', {
+        'query': query,
+        'page_query': urlencode({'q': query}) + '&',
+        'page_obj': Paginator(
+            search.SearchResults(query), settings.POSTS_PER_PAGE
+        ).get_page(request.GET.get('page')) if query else None,
+    })
+
+
+def comments_page(post_id, request):
+    return CursorPaginator(
+        Comment.objects.filter(post_id=post_id).feed(),
+        settings.COMMENTS_PER_PAGE,
+        order_field='created',
+    ).get_page(cursor=request.GET.get('cursor'))
+
+
+@conditional.post_detail
 def post_detail(request, post_id):
     return render(
         request,
         'posts/post_detail.html',
         {
-            'post': get_object_or_404(Post, id=post_id),
+            'post': get_object_or_404(
+                Post.objects.select_related('author__stats', 'group'),
+                id=post_id
+            ),
+            'post_id': post_id,
+            'comments': comments_page(post_id, request),
             'form': CommentForm(request.POST or None),
         }
     )
 
 
+def post_comments(request, post_id):
+    comments = comments_page(post_id, request)
+    if not comments.object_list and not Post.objects.filter(
+        pk=post_id
+    ).exists():
+        raise Http404
+    if request.GET.get('format') != 'json':
+        return render(request, 'includes/comment_list.html', {
+            'post_id': post_id,
+            'comments': comments,
+        })
+    return JsonResponse({
+        'comments': [
+            {
+                'id': comment.pk,
+                'author': comment.author.username,
+                'author_name': comment.author.get_full_name(),
+                'text': comment.text,
+                'created': comment.created.isoformat(),
+            }
+            for comment in comments
+        ],
+        'next_cursor': comments.next_cursor,
+    })
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None,)
@@ -68,6 +150,7 @@ def post_create(request):
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    tasks.schedule_image_processing(post)
     return redirect('posts:profile', request.user.username)
 
 
@@ -83,6 +166,8 @@ def post_edit(request, post_id):
     )
     if form.is_valid():
         form.save()
+        if 'image' in form.changed_data:
+            tasks.schedule_image_processing(post)
         return redirect('posts:post_detail', post.id)
     return render(
         request,
@@ -106,22 +191,19 @@ def add_comment(request, post_id):
 
 
 @login_required
+@conditional.follow_index
 def follow_index(request):
-    return render(
-        request,
-        'posts/follow.html',
-        {
-            'page_obj': page_obj(
-                Post.objects.filter(author__following__user=request.user),
-                request
-            )
-        }
-    )
+    page = page_obj(timeline.entries(request.user), request)
+    page.object_list = [entry.post for entry in page]
+    return render(request, 'posts/follow.html', {
+        'page_obj': page,
+        **feed_cache(request, *conditional.follow_feeds(request)),
+    })
 
 
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = lookup.get_or_404(username)
     user = request.user
     if author != user:
         Follow.objects.get_or_create(user=user, author=author)
@@ -131,6 +213,6 @@ def profile_follow(request, username):
 @login_required
 def profile_unfollow(request, username):
     get_object_or_404(
-        Follow, user=request.user, author__username=username
+        Follow, user=request.user, author=lookup.get_or_404(username)
     ).delete()
     return redirect('posts:profile', username)
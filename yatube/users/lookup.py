@@ -0,0 +1,56 @@
+"""Кэш пользователей по username: id, username и имя.
+
+Возвращаются отложенные экземпляры ``User`` — обращение к прочим
+полям догрузит их из базы. Записи сбрасываются сигналами при
+сохранении и удалении пользователя.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, router
+from django.http import Http404
+
+User = get_user_model()
+
+KEY = 'users:summary:{}'
+FIELDS = ('id', 'username', 'first_name', 'last_name')
+
+
+def key(username):
+    return KEY.format(username)
+
+
+def by_username(username):
+    """Пользователь по username или None, если такого нет."""
+    values = cache.get(key(username))
+    if values is None:
+        values = User.objects.filter(username=username).values_list(
+            *FIELDS
+        ).first()
+        if values is None:
+            return None
+        cache.set(key(username), values, settings.USER_CACHE_TIMEOUT)
+    return User.from_db(
+        router.db_for_read(User) or DEFAULT_DB_ALIAS, FIELDS, values
+    )
+
+
+def get_or_404(username):
+    user = by_username(username)
+    if user is None:
+        raise Http404('Пользователь не найден')
+    return user
+
+
+def changes_summary(update_fields):
+    """Затрагивает ли сохранение с update_fields поля из кэша."""
+    return update_fields is None or bool(set(update_fields) & set(FIELDS))
+
+
+def summary(user):
+    """Значения полей из кэша у экземпляра, в порядке FIELDS."""
+    return tuple(getattr(user, field) for field in FIELDS)
+
+
+def forget(*usernames):
+    cache.delete_many([key(username) for username in usernames if username])
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import lookup
+from .lookup import User, changes_summary
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, raw=False,
+                      **kwargs):
+    """Запоминает прежний username и меняются ли поля из кэша.
+
+    summary_changed ложно, если сохранение (смена пароля, вход, правка
+    в админке) оставило username и имя как были.
+    """
+    instance.previous_username = None
+    instance.summary_changed = changes_summary(update_fields)
+    if instance.pk and not raw and instance.summary_changed:
+        previous = User.objects.filter(pk=instance.pk).values_list(
+            *lookup.FIELDS
+        ).first()
+        if previous is not None:
+            instance.previous_username = previous[
+                lookup.FIELDS.index('username')
+            ]
+            instance.summary_changed = previous != lookup.summary(instance)
+
+
+@receiver(post_save, sender=User)
+def forget_summary(sender, instance, **kwargs):
+    if getattr(instance, 'summary_changed', True):
+        lookup.forget(
+            instance.username, getattr(instance, 'previous_username', None)
+        )
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_summary(sender, instance, **kwargs):
+    lookup.forget(instance.username)
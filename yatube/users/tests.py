@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from . import lookup
+
+User = get_user_model()
+
+
+class UserLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            'StasBasov', first_name='Стас', last_name='Басов'
+        )
+
+    def test_lookup_is_cached(self):
+        """Пользователь по username берется из кэша без запросов."""
+        lookup.by_username('StasBasov')
+        with self.assertNumQueries(0):
+            found = lookup.by_username('StasBasov')
+            self.assertEqual(found, self.user)
+            self.assertEqual(found.get_full_name(), 'Стас Басов')
+        self.assertIsNone(lookup.by_username('missing'))
+
+    def test_cache_is_reset_on_save(self):
+        """Смена имени или username сбрасывает кэш."""
+        lookup.by_username('StasBasov')
+        self.user.first_name = 'Станислав'
+        self.user.save()
+        self.assertEqual(
+            lookup.by_username('StasBasov').first_name, 'Станислав'
+        )
+        self.user.username = 'Stas'
+        self.user.save()
+        self.assertIsNone(lookup.by_username('StasBasov'))
+        self.assertEqual(lookup.by_username('Stas'), self.user)
+        self.user.delete()
+        self.assertIsNone(lookup.by_username('Stas'))
+
+    def test_login_keeps_cache(self):
+        """Обновление last_login при входе не трогает кэш."""
+        lookup.by_username('StasBasov')
+        self.client.force_login(self.user)
+        with self.assertNumQueries(0):
+            lookup.by_username('StasBasov')
+
+    def test_password_change_keeps_cache(self):
+        """Сохранение без смены имени не сбрасывает кэш."""
+        lookup.by_username('StasBasov')
+        self.user.set_password('new-password')
+        self.user.save()
+        with self.assertNumQueries(0):
+            lookup.by_username('StasBasov')
@@ -21,6 +21,48 @@ ALLOWED_HOSTS = [
 ]
 
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+API_MAX_PAGE_SIZE = 100
+TIMELINE_LENGTH = 1000
+POSTS_CACHE_TIMEOUT = 60 * 60 * 24
+GROUP_CACHE_SIZE = 256
+GROUP_CACHE_TIMEOUT = 60
+USER_CACHE_TIMEOUT = 60 * 60
+POST_THUMBNAILS = {
+    'card': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+# Ширины вариантов карточки для srcset; WebP пропускается, если Pillow
+# собран без него.
+POST_IMAGE_WIDTHS = (320, 640, 960)
+POST_IMAGE_FORMATS = ('WEBP', 'JPEG')
+POST_IMAGE_MAX_SIZE = 1920
+
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 30
+JOBS_POLL_INTERVAL = 1
+JOBS_CLAIM_BATCH = 10
+# Задача дольше этого срока в статусе running считается брошенной упавшим
+# воркером и возвращается в очередь; должен быть больше самой долгой задачи.
+JOBS_LEASE_SECONDS = 60 * 10
+# Сколько хранить выполненные задачи; упавшие остаются для разбора.
+JOBS_KEEP_DONE_SECONDS = 60 * 60 * 24
+
+TIMING_WINDOW = 1000
+TIMING_HEADER = True
+
+# Корзины токенов по имени маршрута (core.ratelimit): 'N/m' — N запросов
+# подряд и N в минуту в среднем; methods — по умолчанию только POST.
+RATELIMITS = {
+    'posts:post_create': {'user': '20/m', 'ip': '100/m'},
+    'posts:add_comment': {'user': '30/m', 'ip': '100/m'},
+    'posts:profile_follow': {
+        'user': '30/m', 'ip': '100/m', 'methods': ('GET', 'POST'),
+    },
+}
+# Например 'HTTP_X_FORWARDED_FOR' за обратным прокси; адрес клиента
+# берется RATELIMIT_TRUSTED_PROXIES-м справа.
+RATELIMIT_IP_HEADER = None
+RATELIMIT_TRUSTED_PROXIES = 1
 
 # Application definition
 
@@ -29,6 +71,8 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'about.apps.AboutConfig',
     'posts.apps.PostsConfig',
+    'jobs.apps.JobsConfig',
+    'benchmarks.apps.BenchmarksConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -39,11 +83,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.TimingMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,6 +128,43 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения лент (core.routers). Для локальной проверки:
+# DATABASES['replica'] = {
+#     'ENGINE': 'django.db.backends.sqlite3',
+#     'NAME': os.path.join(BASE_DIR, 'replica.sqlite3'),
+#     'TEST': {'MIRROR': 'default'},
+# }
+# DATABASE_REPLICAS = ['replica']
+# и python manage.py replicate_sqlite
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_PIN_SECONDS = 5
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_posts',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:post_comments',
+    'posts:post_search',
+    'posts:follow_index',
+    'posts:api_index',
+    'posts:api_group_posts',
+    'posts:api_profile',
+    'posts:api_post_detail',
+    'posts:api_follow_index',
+)
+
+# Применяются к каждому новому соединению SQLite (core.signals).
+# WAL позволяет читать во время записи; cache_size < 0 — в килобайтах.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -120,6 +204,10 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+# Сборка: python manage.py build_static. Файлы с хешем в имени отдаются
+# с вечным Cache-Control, рядом лежат готовые .br и .gz.
+STATIC_ROOT = os.path.join(BASE_DIR, 'static_build')
+STATICFILES_STORAGE = 'core.assets.HashedStaticStorage'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -130,6 +218,11 @@ LOGIN_REDIRECT_URL = 'posts:index'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_CACHE_SECONDS = 60 * 60 * 24
+# Передача тела файла прокси: None, 'x-accel-redirect' (nginx, internal
+# location MEDIA_ACCEL_PREFIX с alias на MEDIA_ROOT) или 'x-sendfile'.
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
 
 CACHES = {
     'default': {
@@ -1,19 +1,27 @@
 from django.contrib import admin
 from django.urls import include, path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core.views import media_file, static_file
 
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.csrf_failure'
 handler500 = 'core.views.internal_server_error'
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('core/', include('core.urls', namespace='core')),
     path('about/', include('about.urls', namespace='about')),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('', include('posts.urls', namespace='posts')),
+    path(
+        settings.STATIC_URL.lstrip('/') + '<path:path>',
+        static_file,
+        name='static',
+    ),
+    path(
+        settings.MEDIA_URL.lstrip('/') + '<path:path>',
+        media_file,
+        name='media',
+    ),
 ]
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )